@@ -0,0 +1,147 @@
+import json
+import platform
+import statistics
+import time
+from typing import Any, Callable, Optional
+
+import pytest
+
+RESULTS_KEY = pytest.StashKey[dict[str, dict[str, Any]]]()
+REGRESSIONS_KEY = pytest.StashKey[list[str]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("bench", "benchmarks")
+    group.addoption("--bench-json", help="write benchmark results to this file")
+    group.addoption("--bench-baseline", help="compare against a saved results file")
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown of the best time that counts as a regression",
+    )
+    group.addoption("--bench-rounds", type=int, default=5)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[RESULTS_KEY] = {}
+    config.stash[REGRESSIONS_KEY] = []
+
+
+class Bench:
+    """Times a callable over several rounds after one warm-up call."""
+
+    def __init__(self, name: str, rounds: int, results: dict[str, dict[str, Any]]):
+        self.name = name
+        self.rounds = rounds
+        self.results = results
+
+    def __call__(
+        self,
+        func: Callable[..., Any],
+        setup: Optional[Callable[[], Any]] = None,
+        ops: int = 1,
+    ) -> Any:
+        """Time ``func``; ``setup`` runs untimed before every round and its
+        result is passed to ``func``.  ``ops`` is the number of operations per
+        call, used to report a per-operation time."""
+        result = None
+        times: list[float] = []
+        for i in range(self.rounds + 1):
+            arg = setup() if setup is not None else None
+            start = time.perf_counter()
+            result = func(arg) if setup is not None else func()
+            elapsed = time.perf_counter() - start
+            if i > 0:
+                times.append(elapsed)
+        self.results[self.name] = {
+            "rounds": self.rounds,
+            "ops": ops,
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "per_op_us": min(times) / ops * 1e6,
+        }
+        return result
+
+    def record(self, **info: Any) -> None:
+        """Save extra facts (e.g. node counts) with the timings."""
+        self.results[self.name].update(info)
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> Bench:
+    config = request.config
+    return Bench(
+        request.node.name,
+        config.getoption("--bench-rounds"),
+        config.stash[RESULTS_KEY],
+    )
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float,
+) -> list[str]:
+    """Names of benchmarks whose best time exceeds the baseline's by more
+    than ``threshold``."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is not None and result["min"] > old["min"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    config = session.config
+    results = config.stash[RESULTS_KEY]
+    if not results:
+        return
+
+    baseline_path = config.getoption("--bench-baseline")
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)["benchmarks"]
+        for name, result in results.items():
+            if name in baseline:
+                result["baseline_min"] = baseline[name]["min"]
+        regressions = compare(results, baseline, config.getoption("--bench-threshold"))
+        config.stash[REGRESSIONS_KEY] = regressions
+        if regressions and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    path = config.getoption("--bench-json")
+    if path:
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "benchmarks": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    results = config.stash[RESULTS_KEY]
+    if not results:
+        return
+    regressions = set(config.stash[REGRESSIONS_KEY])
+    terminalreporter.section("benchmarks")
+    for name, result in sorted(results.items()):
+        line = (
+            f"{name:<48} {result['min'] * 1e3:>10.2f} ms"
+            f" {result['per_op_us']:>10.1f} us/op"
+        )
+        if "nodes" in result:
+            line += f" {result['nodes']:>9} nodes"
+        if "baseline_min" in result:
+            change = result["min"] / result["baseline_min"] - 1
+            line += f" {change:>+7.1%}"
+            if name in regressions:
+                line += " REGRESSION"
+        terminalreporter.write_line(line)
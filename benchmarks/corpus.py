@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from src.square import Square
+
+# Fixed positions covering the opening, middlegame and endgame.
+FENS: list[str] = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w - - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "8/8/4k3/8/2p5/8/B3K3/8 w - - 0 1",
+]
+
+# Forced mates as (fen, moves): middlegame combinations and basic endings.
+MATES: list[tuple[str, int]] = [
+    ("r5rk/5p1p/5R2/4B3/8/8/7P/7K w - - 0 1", 3),
+    ("2r3k1/p4p2/3Rp2p/1p2P1pK/8/1P4P1/P3Q2P/1q6 b - - 0 1", 3),
+    ("3k4/6N1/K3p3/2p5/8/8/6Q1/8 w - - 0 1", 3),
+    ("8/8/1Q4K1/8/6k1/8/8/8 w - - 0 1", 3),
+    ("r1b1k3/pp1pq3/7p/5p2/2K5/1npBPPP1/2P5/b5N1 b - - 0 1", 4),
+    ("8/1k6/8/2K5/8/1B6/8/6R1 w - - 0 1", 4),
+    ("7K/8/1N1Q4/8/8/8/8/2k5 w - - 0 1", 4),
+]
+
+GAMES_FILE = Path(__file__).with_name("games.txt")
+
+
+def load_games() -> list[tuple[str, list[tuple[Square, Square]]]]:
+    """Scripted games as ``(fen, moves)`` pairs."""
+    games = []
+    for line in GAMES_FILE.read_text().splitlines():
+        if not line or line.startswith("#"):
+            continue
+        fen, _, moves = line.partition(" | ")
+        games.append(
+            (
+                fen,
+                [
+                    (Square.from_notation(m[:2]), Square.from_notation(m[2:]))
+                    for m in moves.split()
+                ],
+            )
+        )
+    return games
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from src.archive import Archive, ArchiveWriter
+from src.engine import Engine
+from src.pgn import move_to_san, read_pgn, write_pgn
+
+from .corpus import load_games
+
+COPIES = 50
+
+
+@pytest.fixture(scope="module")
+def files(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    """The corpus games, COPIES times over, as PGN and as an archive."""
+    directory = tmp_path_factory.mktemp("archive")
+    pgn, archive = directory / "games.pgn", directory / "games.cga"
+    texts = []
+    with ArchiveWriter(str(archive)) as writer:
+        for fen, moves in load_games():
+            engine = Engine(fen)
+            sans = []
+            for src, dst in moves:
+                sans.append(move_to_san(engine, (src, dst)))
+                piece = engine.get_piece(src)
+                assert piece is not None
+                engine.push(piece, dst)
+            headers = {"White": "white", "Black": "black"}
+            texts.append(write_pgn(sans, "*", headers, fen))
+            for _ in range(COPIES):
+                writer.add(moves, "*", fen, headers)
+    pgn.write_text("\n".join(texts * COPIES))
+    return pgn, archive
+
+
+def test_read_pgn(bench, files: tuple[Path, Path]) -> None:
+    # Tokenising only; the archive also hands back the moves themselves.
+    pgn, _ = files
+
+    def read() -> int:
+        with open(pgn) as f:
+            return sum(len(game.sans) for game in read_pgn(f))
+
+    bench.record(plies=bench(read), bytes=pgn.stat().st_size)
+
+
+def test_read_archive(bench, files: tuple[Path, Path]) -> None:
+    _, archive = files
+
+    def read() -> int:
+        with Archive(str(archive)) as games:
+            return sum(len(game.moves) for game in games)
+
+    bench.record(plies=bench(read), bytes=archive.stat().st_size)
+
+
+def test_open_game(bench, files: tuple[Path, Path]) -> None:
+    _, archive = files
+    with Archive(str(archive)) as games:
+        last = len(games) - 1
+        bench(lambda: games.game(last))
@@ -0,0 +1,76 @@
+import pytest
+
+from src.engine import BACKENDS, Engine, create_engine
+from src.evaluate import pawn_cache
+from src.piece import Color, side_to_move
+from src.search import Search
+from src.stats import perft
+
+from .corpus import FENS, load_games
+
+PERFT_FENS = FENS[1:3]
+PERFT_DEPTH = 2
+SEARCH_FEN = FENS[1]
+SEARCH_DEPTH = 3
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_perft(bench, backend: str) -> None:
+    def run() -> int:
+        return sum(
+            perft(create_engine(backend, fen), Color.WHITE, PERFT_DEPTH)
+            for fen in PERFT_FENS
+        )
+
+    nodes = bench(run)
+    bench.record(nodes=nodes)
+    # Both backends must agree on the move tree.
+    assert nodes == sum(
+        perft(create_engine("legal", fen), Color.WHITE, PERFT_DEPTH)
+        for fen in PERFT_FENS
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_search(bench, backend: str) -> None:
+    def run() -> int:
+        pawn_cache.clear()
+        engine = create_engine(backend, SEARCH_FEN)
+        return Search().think(engine, Color.WHITE, SEARCH_DEPTH, None).nodes
+
+    nodes = bench(run)
+    bench.record(nodes=nodes)
+    # Equal evaluations and move ordering give both backends the same tree.
+    engine = create_engine("legal", SEARCH_FEN)
+    assert nodes == Search().think(engine, Color.WHITE, SEARCH_DEPTH, None).nodes
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_navigate(bench, backend: str, cached: bool) -> None:
+    """Step forward through a game and back again, listing moves each time."""
+    fen, moves = load_games()[0]
+    color = side_to_move(fen)
+
+    def setup() -> Engine:
+        engine = create_engine(backend, fen)
+        if cached:
+            engine.enable_move_cache()
+        return engine
+
+    def navigate(engine: Engine) -> int:
+        total = 0
+        turn = color
+        for src, dst in moves:
+            total += len(engine.legal_moves(turn))
+            piece = engine.get_piece(src)
+            assert piece is not None
+            engine.push(piece, dst)
+            turn = turn.other
+        while engine.undo_stack:
+            engine.pop()
+            turn = turn.other
+            total += len(engine.legal_moves(turn))
+        return total
+
+    bench(navigate, setup=setup, ops=2 * len(moves))
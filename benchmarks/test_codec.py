@@ -0,0 +1,38 @@
+import pickle
+
+import pytest
+
+from src import codec
+from src.engine import BACKENDS, Engine, create_engine
+from src.piece import side_to_move
+
+from .corpus import FENS
+
+
+def test_encode(bench) -> None:
+    engines = [(Engine(fen), side_to_move(fen)) for fen in FENS]
+    bench(lambda: [engine.encode(color) for engine, color in engines], ops=len(FENS))
+
+
+def test_pickle(bench) -> None:
+    # The cost encode() replaces when handing positions to worker processes.
+    engines = [Engine(fen) for fen in FENS]
+    bench(lambda: [pickle.dumps(engine) for engine in engines], ops=len(FENS))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_decode(bench, backend: str) -> None:
+    decode = type(create_engine(backend)).decode
+    data = [codec.from_fen(fen) for fen in FENS]
+    engines = bench(lambda: [decode(d) for d in data], ops=len(FENS))
+    assert [e.encode(color) for e, color in engines] == data
+
+
+def test_batch_roundtrip(bench) -> None:
+    fens = FENS * 100
+
+    def roundtrip() -> list[str]:
+        return list(codec.batch_to_fens(codec.fens_to_batch(fens)))
+
+    expected = [codec.to_fen(codec.from_fen(fen)) for fen in fens]
+    assert bench(roundtrip, ops=len(fens)) == expected
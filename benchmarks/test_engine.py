@@ -0,0 +1,103 @@
+import pytest
+
+from src.board import Board
+from src.engine import BACKENDS, Engine, create_engine
+from src.piece import Color, side_to_move
+from src.square import Square
+
+from .corpus import FENS, load_games
+
+GAMES = load_games()
+Moves = list[tuple[Square, Square]]
+
+
+def play(engine: Engine, moves: Moves) -> None:
+    for src, dst in moves:
+        piece = engine.get_piece(src)
+        assert piece is not None
+        engine.move_piece(piece, dst)
+
+
+@pytest.mark.parametrize("fen", FENS, ids=range(len(FENS)))
+def test_engine_init(bench, fen: str) -> None:
+    bench(lambda: Engine(fen))
+
+
+def test_load_fen(bench) -> None:
+    engine = Engine()
+
+    def load() -> None:
+        for fen in FENS:
+            engine.board = Board(64)
+            engine.load_fen(fen)
+
+    bench(load, ops=len(FENS))
+
+
+@pytest.mark.parametrize("game", range(len(GAMES)))
+def test_move_piece(bench, game: int) -> None:
+    fen, moves = GAMES[game]
+    bench(lambda engine: play(engine, moves), setup=lambda: Engine(fen), ops=len(moves))
+
+
+def test_list_moves(bench) -> None:
+    engines = [Engine(fen) for fen in FENS]
+
+    def list_all() -> int:
+        total = 0
+        for engine in engines:
+            for color in Color:
+                for piece in engine.board.get_all_pieces(color):
+                    total += len(engine.list_moves(piece))
+        return total
+
+    bench(list_all, ops=len(engines))
+
+
+def test_nmoves(bench) -> None:
+    engines = [Engine(fen) for fen in FENS]
+
+    def count() -> int:
+        return sum(e.nmoves(color) for e in engines for color in Color)
+
+    bench(count, ops=2 * len(engines))
+
+
+@pytest.mark.parametrize("game", range(len(GAMES)))
+def test_replay(bench, game: int) -> None:
+    """A full game as the game loop drives it: end checks before each move."""
+    fen, moves = GAMES[game]
+
+    def replay() -> None:
+        engine = Engine(fen)
+        color = side_to_move(fen)
+        for src, dst in moves:
+            assert not engine.status(color).is_over
+            piece = engine.get_piece(src)
+            assert piece is not None
+            engine.move_piece(piece, dst)
+            color = color.other
+
+    bench(replay, ops=len(moves))
+
+
+# After e2e4, knights out and back twice.  The en passant square only
+# counts while a black pawn stands next to e4.
+SHUFFLE = ["e2e4"] + ["g8f6", "g1f3", "f6g8", "f3g1"] * 2
+
+
+@pytest.mark.parametrize("capturable", [False, True], ids=["no_ep", "ep"])
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_repetition_after_double_push(backend: str, capturable: bool) -> None:
+    fen = "rnbqkbnr/ppp1pppp/8/8/3p4/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+    if not capturable:
+        fen = fen.replace("3p4", "p7")
+    engine = create_engine(backend, fen)
+    play(
+        engine,
+        [(Square.from_notation(m[:2]), Square.from_notation(m[2:])) for m in SHUFFLE],
+    )
+    assert engine.is_repetition() == (not capturable)
+    if capturable:
+        # Occurrences without the capture only: the first and this one.
+        assert engine.is_repetition(2)
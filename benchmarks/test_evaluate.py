@@ -0,0 +1,56 @@
+from src.engine import BACKENDS, Engine, create_engine
+from src.evaluate import PawnCache, evaluate, pawn_cache
+from src.piece import Color, side_to_move
+
+from .corpus import FENS, load_games
+
+
+def test_evaluate(bench) -> None:
+    engines = [Engine(fen) for fen in FENS]
+
+    def run() -> None:
+        for engine in engines:
+            evaluate(engine, Color.WHITE)
+
+    pawn_cache.clear()
+    bench(run, ops=len(engines))
+
+
+def test_pawn_cache_miss(bench) -> None:
+    engines = [Engine(fen) for fen in FENS]
+
+    def run(cache: PawnCache) -> None:
+        for engine in engines:
+            cache.score(engine)
+
+    bench(run, setup=PawnCache, ops=len(engines))
+
+
+def test_pawn_cache_hit(bench) -> None:
+    engines = [Engine(fen) for fen in FENS]
+    cache = PawnCache()
+    for engine in engines:
+        cache.score(engine)
+
+    def run() -> None:
+        for engine in engines:
+            cache.score(engine)
+
+    bench(run, ops=len(engines))
+
+
+def test_evaluate_backends_agree() -> None:
+    # The corpus positions and every position of the scripted games.
+    for fen, moves in [(fen, []) for fen in FENS] + load_games():
+        engines = [create_engine(backend, fen) for backend in BACKENDS]
+        color = side_to_move(fen)
+        for ply in range(len(moves) + 1):
+            legal, pseudo = (evaluate(engine, color) for engine in engines)
+            assert legal == pseudo, (fen, ply)
+            if ply < len(moves):
+                src, dst = moves[ply]
+                for engine in engines:
+                    piece = engine.get_piece(src)
+                    assert piece is not None
+                    engine.move_piece(piece, dst)
+                color = color.other
@@ -0,0 +1,96 @@
+import pytest
+
+from src.engine import BACKENDS, Engine, create_engine
+from src.piece import Color, Type, side_to_move
+from src.square import Square
+from src.tables import BISHOP_RAYS, KING_STEPS, KNIGHT_STEPS, ROOK_RAYS
+
+from .corpus import FENS
+
+np = pytest.importorskip("numpy")
+features = pytest.importorskip("src.features")
+
+BATCH = 1024
+
+
+def test_extract(bench) -> None:
+    positions = [(Engine(fen), side_to_move(fen)) for fen in FENS]
+    batch = (positions * (BATCH // len(positions) + 1))[:BATCH]
+    planes = bench(lambda: features.extract(batch), ops=BATCH)
+    assert planes.shape == (BATCH, features.NUM_PLANES, 8, 8)
+
+
+def test_fill(bench) -> None:
+    """The numpy half of extraction, into a preallocated buffer."""
+    rows = [features.gather(Engine(fen), side_to_move(fen)) for fen in FENS]
+    rows = (rows * (BATCH // len(rows) + 1))[:BATCH]
+    out = np.empty((BATCH, features.NUM_PLANES, 8, 8), dtype=np.uint8)
+    bench(lambda: features.fill(rows, out), ops=BATCH)
+
+
+def count_attackers(engine: Engine, sq: int, color: Color) -> int:
+    """Pieces of ``color`` attacking ``sq``, counted from the board alone."""
+    board = engine.board.board
+    count = 0
+    behind = -1 if color == Color.WHITE else 1
+    for df in (-1, 1):
+        src = Square.from_coords((sq >> 3) + df, (sq & 7) + behind)
+        if src is not None:
+            p = board[src]
+            count += p is not None and p.id == Type.PAWN | color
+    for steps, kind in ((KNIGHT_STEPS, Type.KNIGHT), (KING_STEPS, Type.KING)):
+        for t in steps[sq]:
+            p = board[t]
+            count += p is not None and p.id == kind | color
+    for rays, kind in ((ROOK_RAYS, Type.ROOK), (BISHOP_RAYS, Type.BISHOP)):
+        for ray in rays[sq]:
+            for t in ray:
+                p = board[t]
+                if p is not None:
+                    count += p.id in (kind | color, Type.QUEEN | color)
+                    break
+    return count
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_attack_planes(backend: str) -> None:
+    for fen in FENS:
+        engine = create_engine(backend, fen)
+        planes = features.extract([(engine, side_to_move(fen))])[0]
+        for color in Color:
+            expected = [count_attackers(engine, sq, color) for sq in range(64)]
+            got = planes[features.ATTACKS + color].reshape(64).tolist()
+            assert got == expected, (fen, color.name)
+
+
+# Pins, checks and pinned en passant captures, with the side not to move
+# out of check so its moves are defined too.
+PIN_FENS = [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1",
+    "8/8/8/KPp4r/8/8/8/7k w - c6 0 2",
+    "8/8/3k4/8/2pP4/8/B7/4K3 b - d3 0 1",
+    "rnb1kbnr/pppp1ppp/8/4p3/5PPq/8/PPPPP2P/RNBQKBNR w - - 1 3",
+    "4k3/4r3/8/8/4B3/8/3n4/4K3 w - - 0 1",
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_move_planes_legal(backend: str) -> None:
+    chess = pytest.importorskip("chess")
+    for fen in PIN_FENS:
+        engine = create_engine(backend, fen)
+        planes = features.extract([(engine, side_to_move(fen))])[0]
+        for color in Color:
+            board = chess.Board(fen)
+            if board.turn != (color == Color.WHITE):
+                board.turn = not board.turn
+                board.ep_square = None
+            expected = np.zeros((12, 64), dtype=np.uint8)
+            for move in board.legal_moves:
+                piece = board.piece_at(move.from_square)
+                piece_id = (piece.piece_type - 1) * 2 | color
+                sq = chess.square_file(move.to_square) << 3
+                expected[piece_id, sq | chess.square_rank(move.to_square)] = 1
+            got = planes[features.MOVES : features.MOVES + 12].reshape(12, 64)
+            ids = slice(color, 12, 2)
+            assert (got[ids] == expected[ids]).all(), (fen, color.name)
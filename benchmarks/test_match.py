@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from src import match
+from src.bitbase import Bitbases, build
+from src.engine import Engine
+from src.match import OPENINGS, EngineConfig, MatchResult, play_game
+from src.piece import Color
+from src.search import Search
+
+
+def test_bitbases_per_side(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    build(str(tmp_path), ["KRK"])
+    probed: dict[Color, set[bool]] = {Color.WHITE: set(), Color.BLACK: set()}
+    think = Search.think
+
+    def spy(self: Search, engine: Engine, color: Color, *args, **kwargs):
+        probed[color].add(engine.bitbases is not None)
+        return think(self, engine, color, *args, **kwargs)
+
+    monkeypatch.setattr(Search, "think", spy)
+    white = EngineConfig("white", max_depth=1)
+    black = EngineConfig("black", max_depth=1, bitbase_dir=str(tmp_path))
+    play_game(white, black, "8/8/8/3k4/8/8/2R5/4K3 w - - 0 1", max_plies=6)
+    assert probed == {Color.WHITE: {False}, Color.BLACK: {True}}
+
+
+def test_bitbases_opened_once(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    build(str(tmp_path), ["KRK"])
+    opened: list[str] = []
+
+    class Counting(Bitbases):
+        def __init__(self, directory: str) -> None:
+            opened.append(directory)
+            super().__init__(directory)
+
+    monkeypatch.setattr(match, "Bitbases", Counting)
+    config = EngineConfig("engine", max_depth=1, bitbase_dir=str(tmp_path))
+    for _ in range(2):
+        play_game(config, config, "8/8/8/3k4/8/8/2R5/4K3 w - - 0 1", max_plies=2)
+    assert opened == [str(tmp_path)]
+
+
+def test_max_plies_unfinished() -> None:
+    white = EngineConfig("white", max_depth=1)
+    black = EngineConfig("black", max_depth=1)
+    record = play_game(white, black, OPENINGS[0], max_plies=4)
+    assert (record.result, record.reason) == ("*", "max plies")
+    match = MatchResult("white", "black")
+    match.add(record)
+    assert (match.played, match.unfinished) == (0, 1)
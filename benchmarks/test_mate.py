@@ -0,0 +1,25 @@
+from typing import Optional
+
+from src.engine import create_engine
+from src.mate import MateSolver
+from src.piece import side_to_move
+
+from .corpus import MATES
+
+# The legal backend makes moves ~30x slower, which PN search feels fully.
+BACKEND = "pseudo"
+
+
+def test_mate_suite(bench) -> None:
+    """Prove every mate in the suite from a cold node table."""
+
+    def solve() -> list[Optional[int]]:
+        solver = MateSolver()
+        return [
+            solver.solve(create_engine(BACKEND, fen), side_to_move(fen), moves).moves
+            for fen, moves in MATES
+        ]
+
+    assert bench(solve, ops=len(MATES)) == [moves for _, moves in MATES]
+    best = bench.results[bench.name]["min"]
+    bench.record(positions_per_s=round(len(MATES) / best, 2))
@@ -0,0 +1,86 @@
+import pytest
+
+from src import codec
+from src.engine import BACKENDS, Engine, create_engine
+from src.piece import Color, side_to_move
+from src.square import Square
+from src.stats import perft
+
+# Leaf counts at depths 1, 2, ... of the standard test positions, with
+# castling rights removed (the engine does not castle), and of positions
+# where moves make, break and shift pins.
+PIN_PERFT: list[tuple[str, list[int]]] = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1", [20, 400]),
+    (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1",
+        [46, 1866],
+    ),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812]),
+    (
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        [46, 2079],
+    ),
+    ("4k3/4r3/8/8/8/8/4B3/R3K3 w - - 0 1", [14, 207, 4129]),
+    ("4k3/8/8/8/1b6/8/3N4/R3K2r w - - 0 1", [2, 54, 1159]),
+    # The king steps next to a bishop's diagonal through its pinned knight.
+    ("4r2k/8/8/7b/8/8/4N3/4K3 w - - 0 1", [4, 80, 682]),
+    # The queen takes over the rook's pin by stepping in front of it.
+    ("4r2k/8/3q4/8/8/4N3/8/4K3 b - - 0 1", [39, 181]),
+]
+
+# Positions each exercising one move generation rule, with leaf counts.
+MOVEGEN_PERFT: list[tuple[str, list[int]]] = [
+    # A checked king may not step back along the checking rook's line.
+    ("3k4/8/8/8/8/8/8/r3K3 w - - 0 1", [3, 57, 327, 6090]),
+    # No double push over the blocking knight.
+    ("4k3/8/8/8/8/4n3/4P3/4K3 w - - 0 1", [2, 26, 162, 1882]),
+    # The pinned rook still covers d7 from the black king.
+    ("3k4/8/8/8/8/8/8/q2RK3 b - - 0 1", [6, 38, 678]),
+    # The checking pawn can be taken en passant.
+    ("8/8/8/2k5/3Pp3/8/8/4K3 b - d3 0 1", [9, 50, 379, 2369]),
+    # Pawns do not capture their own knights.
+    ("4k3/8/8/8/8/3N1N2/4P3/4K3 w - - 0 1", [20, 94, 1804]),
+]
+
+PERFT = {
+    **{f"pins-{i}": case for i, case in enumerate(PIN_PERFT)},
+    **{f"movegen-{i}": case for i, case in enumerate(MOVEGEN_PERFT)},
+}
+
+
+@pytest.mark.parametrize("fen,counts", PERFT.values(), ids=PERFT.keys())
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_perft(backend: str, fen: str, counts: list[int]) -> None:
+    color = side_to_move(fen)
+    for depth, expected in enumerate(counts, 1):
+        assert perft(create_engine(backend, fen), color, depth) == expected
+
+
+# Positions with an en passant capture that is pinned or unpinned, and
+# their leaf counts at depths 1-3.
+EP_PIN_PERFT: list[tuple[str, list[int]]] = [
+    ("8/8/8/KPp4r/8/8/8/7k w - c6 0 2", [4, 56, 259]),
+    ("7k/8/8/r2pP2K/8/8/8/8 w - d6 0 1", [6, 74, 476]),
+    ("8/8/8/8/k2Pp2Q/8/8/3K4 b - d3 0 1", [6, 136, 863]),
+    ("8/8/3k4/8/2pP4/8/B7/4K3 b - d3 0 1", [8, 76, 551]),
+]
+
+
+@pytest.mark.parametrize("fen,counts", EP_PIN_PERFT, ids=range(len(EP_PIN_PERFT)))
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_perft_ep_pin(backend: str, fen: str, counts: list[int]) -> None:
+    color = side_to_move(fen)
+    decode = type(create_engine(backend)).decode
+    for depth, expected in enumerate(counts, 1):
+        assert perft(create_engine(backend, fen), color, depth) == expected
+        engine, _ = decode(codec.from_fen(fen))
+        assert perft(engine, color, depth) == expected
+
+
+def test_perft_ep_pin_after_push() -> None:
+    # The same position reached by the double push, not loaded with it.
+    engine = Engine("8/2p5/8/KP5r/8/8/8/7k b - - 0 1")
+    pawn = engine.get_piece(Square.from_notation("c7"))
+    assert pawn is not None
+    engine.move_piece(pawn, Square.from_notation("c5"))
+    assert perft(engine, Color.WHITE, 3) == 259
@@ -0,0 +1,52 @@
+import pytest
+
+from src.engine import Engine
+from src.evaluate import pawn_cache
+from src.piece import Color
+from src.search import Search
+from src.telemetry import Telemetry
+
+from .corpus import FENS
+
+FEN = FENS[1]
+DEPTH = 3
+FEATURES = {
+    "plain": (False, False, False),
+    "null_move": (True, False, False),
+    "lmr": (False, True, False),
+    "aspiration": (False, False, True),
+    "all": (True, True, True),
+}
+
+
+@pytest.mark.parametrize("features", FEATURES)
+def test_nodes_to_depth(bench, features: str) -> None:
+    """Time and nodes to reach DEPTH with each pruning feature on its own."""
+    null_move, lmr, aspiration = FEATURES[features]
+
+    def search() -> int:
+        pawn_cache.clear()
+        search = Search(1 << 18, null_move, lmr, aspiration)
+        return search.think(Engine(FEN), Color.WHITE, DEPTH, None).nodes
+
+    bench.record(nodes=bench(search), pawn_hit_rate=pawn_cache.hit_rate)
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_telemetry(bench, enabled: bool) -> None:
+    """Search cost with and without per-iteration telemetry attached."""
+    telemetry = Telemetry() if enabled else None
+
+    def search() -> int:
+        pawn_cache.clear()
+        search = Search(telemetry=telemetry)
+        return search.think(Engine(FEN), Color.WHITE, DEPTH, None).nodes
+
+    bench.record(nodes=bench(search))
+    if telemetry is not None:
+        last = telemetry.iterations[-1]
+        bench.record(
+            ebf=last.ebf,
+            first_move_cutoff_rate=last.first_move_cutoff_rate,
+            tt_hit_rate=last.tt_hit_rate,
+        )
@@ -0,0 +1,41 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.server import EnginePool, Server
+
+
+async def _session(lines: list[str]) -> list[str]:
+    server = Server(ThreadPoolExecutor(1))
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = []
+    for line in lines:
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+        replies.append((await reader.readline()).decode().rstrip())
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    server.executor.shutdown()
+    return replies
+
+
+def test_malformed_move_keeps_connection() -> None:
+    replies = asyncio.run(_session(["new", "move 1", "move 1 e2", "move 1 e2e4"]))
+    assert replies[0] == "ok 1"
+    assert replies[1].startswith("err Usage:")
+    assert replies[2].startswith("err Bad move")
+    assert replies[3] == "ok -"
+
+
+def test_pool_bounded() -> None:
+    pool = EnginePool(max_idle=4)
+    fens = [f"4k3/8/8/8/8/8/{i}P{6 - i}/4K3 w - - 0 1" for i in range(7)]
+    for fen in fens:
+        pool.release(pool.acquire(fen))
+    assert pool.size == sum(map(len, pool.idle.values())) == 4
+    # The most recently released positions are the ones kept.
+    assert list(pool.idle) == fens[-4:]
+    pool.acquire(fens[-1])
+    assert pool.reused == 1 and fens[-1] not in pool.idle
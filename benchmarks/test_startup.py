@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Everything a headless worker does before its first engine move.
+FIRST_MOVE = """
+from src.engine import Engine
+from src.piece import Color
+from src.search import Search
+
+Search().think(Engine(), Color.WHITE, max_depth=1, time_limit=None)
+"""
+
+
+def run(code: str, cache_dir: Path) -> None:
+    env = dict(os.environ, CHESS_CACHE_DIR=str(cache_dir))
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+def test_first_move_cold_cache(bench, tmp_path: Path) -> None:
+    def empty_cache() -> Path:
+        for f in tmp_path.glob("*"):
+            f.unlink()
+        return tmp_path
+
+    bench(lambda cache: run(FIRST_MOVE, cache), setup=empty_cache)
+
+
+def test_first_move_warm_cache(bench, tmp_path: Path) -> None:
+    run("import src.tables", tmp_path)
+    bench(lambda: run(FIRST_MOVE, tmp_path))
+
+
+@pytest.mark.parametrize("module", ["src.game", "src.display.term"])
+def test_headless_import_skips_tkinter(module: str, tmp_path: Path) -> None:
+    run(f"import sys, {module}; assert 'tkinter' not in sys.modules", tmp_path)
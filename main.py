@@ -1,16 +1,43 @@
-from src.display.gui import TkDisplay
-from src.engine import Engine
-from src.game import Game
+import argparse
 
-# from src.display.term import TermDisplay
+from src.display import DISPLAYS, create_display
+from src.engine import BACKENDS, create_engine
+from src.explorer import Explorer
+from src.game import Game
+from src.piece import Color
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Play chess.")
+    parser.add_argument("--display", choices=sorted(DISPLAYS), default="tk")
+    parser.add_argument(
+        "--engine", choices=["white", "black"], help="side played by the engine"
+    )
+    parser.add_argument("--think", type=float, default=1.0, help="seconds per move")
+    parser.add_argument(
+        "--ponder", action="store_true", help="think on the opponent's time"
+    )
+    parser.add_argument("--book", help="opening explorer index from src.explorer")
+    parser.add_argument("--backend", choices=BACKENDS, default="legal")
+    args = parser.parse_args()
+
     print("Hello from chess-engine!")
-    engine = Engine()
-    display = TkDisplay()
+    engine = create_engine(args.backend)
+    display = create_display(args.display)
+    engine_color = Color[args.engine.upper()] if args.engine else None
     # board = Board("rnbqkbnr/1ppppppp/8/8/p1B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 0 1")
-    game = Game(engine, display)
+    explorer = Explorer(args.book) if args.book else None
+    game = Game(
+        engine,
+        display,
+        engine_color=engine_color,
+        think_time=args.think,
+        ponder=args.ponder,
+        # The legal backend keeps move lists up to date as it plays, so only
+        # pseudo-legal generation is worth caching.
+        move_cache=args.backend == "pseudo",
+        explorer=explorer,
+    )
     game.run()
 
 
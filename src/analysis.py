@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+from .engine import Engine
+from .piece import Color, Type, side_to_move
+from .search import Search
+
+# One search per worker process, so its transposition table is reused.
+_search: Optional[Search] = None
+
+
+def iter_positions(lines: Iterable[str]) -> Iterator[str]:
+    """FENs from FEN or EPD lines, skipping blanks and comments."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split(" ")
+        if len(fields) < 6 or not (fields[4].isdigit() and fields[5].isdigit()):
+            # EPD: drop the operations and pad the missing clocks.
+            fields = fields[:4] + ["0", "1"]
+        yield " ".join(fields[:6])
+
+
+def analyse(
+    engine: Engine, color: Color, depth: int = 0, search: Optional[Search] = None
+) -> dict[str, Any]:
+    """Facts about the position in ``engine`` with ``color`` to move."""
+    king = engine.board.get_king(color)
+    status = engine.status(color)
+    facts: dict[str, Any] = {
+        "to_move": color.name.lower(),
+        "nmoves": {c.name.lower(): engine.nmoves(c) for c in Color},
+        "in_check": status.in_check,
+        "checkers": [str(p.loc) for p in engine.pinned_or_checked.get(king, [])],
+        "pinned": sorted(
+            str(p.loc)
+            for p in engine.pinned_or_checked
+            if p.type != Type.KING and not p.captured
+        ),
+        "result": status.result,
+    }
+    if depth > 0 and not status.is_over:
+        search = search or Search()
+        result = search.think(engine, color, max_depth=depth, time_limit=None)
+        if result.move is not None:
+            facts["best_move"] = f"{result.move[0]}{result.move[1]}"
+            facts["score"] = result.score
+    return facts
+
+
+def analyse_fen(fen: str, depth: int = 0) -> dict[str, Any]:
+    global _search
+    if depth > 0 and _search is None:
+        _search = Search(1 << 16)
+    try:
+        engine = Engine(fen)
+        return {"fen": fen, **analyse(engine, side_to_move(fen), depth, _search)}
+    except (ValueError, IndexError, KeyError) as e:
+        return {"fen": fen, "error": str(e) or type(e).__name__}
+
+
+def _analyse_chunk(fens: list[str], depth: int) -> list[dict[str, Any]]:
+    return [analyse_fen(fen, depth) for fen in fens]
+
+
+def analyse_batch(
+    positions: Iterable[str],
+    depth: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+) -> Iterator[dict[str, Any]]:
+    """Analyse ``positions`` over a process pool, yielding in input order.
+
+    Positions are read lazily and at most two chunks per worker are in
+    flight, so memory stays bounded however long the input is.
+    """
+    workers = workers or os.cpu_count() or 1
+    it = iter(positions)
+    pending: deque[Future[list[dict[str, Any]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submit() -> bool:
+            chunk = list(islice(it, chunk_size))
+            if chunk:
+                pending.append(pool.submit(_analyse_chunk, chunk, depth))
+            return bool(chunk)
+
+        while len(pending) < 2 * workers and submit():
+            pass
+        while pending:
+            results = pending.popleft().result()
+            submit()
+            yield from results
+
+
+def write_jsonl(results: Iterable[dict[str, Any]], out: TextIO) -> int:
+    count = 0
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Analyse FEN/EPD positions and write JSON lines."
+    )
+    parser.add_argument("input", help="file with one FEN/EPD per line, or -")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--depth", type=int, default=0, help="search depth")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=256)
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        results = analyse_batch(
+            iter_positions(source), args.depth, args.workers, args.chunk
+        )
+        write_jsonl(results, out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional, Sequence
+
+from . import codec
+from .engine import Engine, Move, create_engine
+from .movecache import MOVES
+from .pgn import PgnGame, move_to_san, read_pgn, san_to_move, write_pgn
+from .piece import Color, side_to_move
+
+MAGIC = b"CGAR"
+VERSION = 1
+# Magic, version, game count, offset of the index.
+HEADER = struct.Struct("<4sBxxxQQ")
+# Result, flags, plies, length of the tag text.  A game record is this,
+# the packed start position if FLAG_START is set, the tags, then one
+# little-endian 16-bit ``from << 6 | to`` code per ply.
+GAME = struct.Struct("<BBHH")
+FLAG_START = 1
+RESULT_CODES = ("*", "1-0", "0-1", "1/2-1/2")
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+# PGN tags kept on import; the result and start position are stored anyway.
+KEEP_TAGS = ("White", "Black")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+@dataclass
+class ArchivedGame:
+    moves: list[Move]
+    result: str = "*"
+    fen: Optional[str] = None
+    tags: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def pgn(self) -> str:
+        engine = Engine(self.fen or START_FEN)
+        sans: list[str] = []
+        for move in self.moves:
+            sans.append(move_to_san(engine, move))
+            piece = engine.get_piece(move[0])
+            assert piece is not None
+            engine.push(piece, move[1])
+        return write_pgn(sans, self.result, self.tags, self.fen)
+
+
+def _pack_tags(tags: dict[str, str]) -> bytes:
+    return "\n".join(f"{name}\t{value}" for name, value in tags.items()).encode()
+
+
+def _unpack_tags(data: bytes) -> dict[str, str]:
+    if not data:
+        return {}
+    return dict(line.split("\t", 1) for line in data.decode().split("\n"))
+
+
+class ArchiveWriter:
+    """Appends games to a new archive; the index is written on close.
+
+    The file is built under a temporary name and renamed into place, so a
+    reader never sees a half-written archive.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.tmp = f"{path}.{os.getpid()}.tmp"
+        self.f = open(self.tmp, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self.offsets: "array[int]" = array("Q")
+        self.skipped = 0
+        self._engine: Optional[Engine] = None
+
+    def add(
+        self,
+        moves: Sequence[Move],
+        result: str = "*",
+        fen: Optional[str] = None,
+        tags: Optional[dict[str, str]] = None,
+    ) -> int:
+        """Append one game; returns its number."""
+        if len(moves) > 0xFFFF:
+            raise ValueError(f"Game too long: {len(moves)} plies")
+        start = b"" if fen is None or fen == START_FEN else codec.from_fen(fen)
+        text = _pack_tags(tags or {})
+        codes = array("H", [src << 6 | dst for src, dst in moves])
+        if _BIG_ENDIAN:
+            codes.byteswap()
+        self.offsets.append(self.f.tell())
+        self.f.write(
+            GAME.pack(
+                RESULT_CODES.index(result) if result in RESULT_CODES else 0,
+                FLAG_START if start else 0,
+                len(codes),
+                len(text),
+            )
+        )
+        self.f.write(start)
+        self.f.write(text)
+        self.f.write(codes.tobytes())
+        return len(self.offsets) - 1
+
+    def add_pgn(self, game: PgnGame, keep: Iterable[str] = KEEP_TAGS) -> Optional[int]:
+        """Append a PGN game, or skip it (returning None) if a move cannot
+        be played by the engine."""
+        fen = game.fen or START_FEN
+        # Consecutive games from one position reuse the engine.  Resolving
+        # SAN makes a move per ply, which the pseudo backend does cheaply.
+        engine = self._engine
+        try:
+            if engine is not None and engine.fen == fen:
+                engine.rewind()
+            else:
+                engine = self._engine = create_engine("pseudo", fen)
+            color = side_to_move(fen)
+            moves: list[Move] = []
+            for san in game.sans:
+                move = san_to_move(engine, color, san)
+                moves.append(move)
+                piece = engine.get_piece(move[0])
+                assert piece is not None
+                engine.push(piece, move[1])
+                color = color.other
+        except (ValueError, IndexError, KeyError):
+            self._engine = None
+            self.skipped += 1
+            return None
+        tags = {name: game.headers[name] for name in keep if name in game.headers}
+        return self.add(moves, game.result, game.fen, tags)
+
+    def close(self) -> None:
+        if _BIG_ENDIAN:
+            self.offsets.byteswap()
+        index = self.f.tell()
+        self.f.write(self.offsets.tobytes())
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, len(self.offsets), index))
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.f.close()
+            os.remove(self.tmp)
+
+
+class Archive:
+    """Memory-mapped reader for files written by :class:`ArchiveWriter`.
+
+    Game ``i`` is found through the offset index, so opening it touches only
+    its own bytes.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, index = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a game archive: {path}")
+        if len(self.mm) != index + 8 * self.count:
+            raise ValueError(f"Truncated game archive: {path}")
+        self.offsets: "array[int]" = array("Q")
+        self.offsets.frombytes(self.mm[index:])
+        if _BIG_ENDIAN:
+            self.offsets.byteswap()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, i: int) -> tuple[int, Optional[str], bytes, int, int]:
+        if not 0 <= i < self.count:
+            raise IndexError(f"No game {i} in an archive of {self.count}")
+        offset = self.offsets[i]
+        result, flags, plies, text = GAME.unpack_from(self.mm, offset)
+        offset += GAME.size
+        fen = None
+        if flags & FLAG_START:
+            fen = codec.to_fen(self.mm[offset : offset + codec.SIZE])
+            offset += codec.SIZE
+        tags = self.mm[offset : offset + text]
+        return result, fen, tags, offset + text, plies
+
+    def _codes(self, offset: int, plies: int) -> "array[int]":
+        codes = array("H")
+        codes.frombytes(self.mm[offset : offset + 2 * plies])
+        if _BIG_ENDIAN:
+            codes.byteswap()
+        return codes
+
+    def codes(self, i: int) -> "array[int]":
+        """Packed ``from << 6 | to`` moves of game ``i``."""
+        _, _, _, offset, plies = self._record(i)
+        return self._codes(offset, plies)
+
+    def game(self, i: int) -> ArchivedGame:
+        result, fen, tags, offset, plies = self._record(i)
+        moves = [MOVES[code] for code in self._codes(offset, plies)]
+        return ArchivedGame(moves, RESULT_CODES[result], fen, _unpack_tags(tags))
+
+    def __iter__(self) -> Iterator[ArchivedGame]:
+        for i in range(self.count):
+            yield self.game(i)
+
+    def replay(
+        self, i: int, engine: Optional[Engine] = None
+    ) -> Iterator[tuple[Engine, Color, Move]]:
+        """Play game ``i`` into ``engine`` (rewound, if it starts from the
+        game's position; a new engine otherwise), yielding the engine, side
+        to move and move before each move is pushed."""
+        _, fen, _, offset, plies = self._record(i)
+        fen = fen or START_FEN
+        if engine is not None and engine.fen == fen:
+            engine.rewind()
+        else:
+            engine = Engine(fen)
+        color = side_to_move(fen)
+        for code in self._codes(offset, plies):
+            move = MOVES[code]
+            yield engine, color, move
+            piece = engine.get_piece(move[0])
+            if piece is None:
+                raise ValueError(f"Game {i}: no piece on {move[0]}")
+            engine.push(piece, move[1])
+            color = color.other
+
+    def close(self) -> None:
+        self.mm.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and read game archives.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("import", help="convert PGN files to an archive")
+    build.add_argument("archive")
+    build.add_argument("pgn", nargs="+", help="PGN files, or - for stdin")
+    build.add_argument(
+        "--tags", default=",".join(KEEP_TAGS), help="comma-separated tags to keep"
+    )
+    show = commands.add_parser("show", help="print games as PGN")
+    show.add_argument("archive")
+    show.add_argument("games", nargs="*", type=int, help="game numbers (default all)")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        with Archive(args.archive) as archive:
+            for i in args.games or range(len(archive)):
+                print(archive.game(i).pgn)
+        return
+
+    def games() -> Iterator[PgnGame]:
+        for name in args.pgn:
+            if name == "-":
+                yield from read_pgn(sys.stdin)
+            else:
+                with open(name, errors="replace") as f:
+                    yield from read_pgn(f)
+
+    keep = [tag for tag in args.tags.split(",") if tag]
+    start = time.perf_counter()
+    with ArchiveWriter(args.archive) as writer:
+        for game in games():
+            writer.add_pgn(game, keep)
+    total = len(writer.offsets)
+    print(
+        f"{total} games ({writer.skipped} skipped), "
+        f"{os.path.getsize(args.archive)} bytes in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
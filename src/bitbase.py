@@ -0,0 +1,375 @@
+import argparse
+import mmap
+import os
+import struct
+from array import array
+from enum import IntEnum
+from itertools import product
+from typing import Iterator, Optional
+
+from .board import Board
+from .piece import Color, Type
+from .square import Square
+from .tables import (
+    BETWEEN,
+    BISHOP_RAYS,
+    KING_MASK,
+    KING_STEPS,
+    KNIGHT_MASK,
+    KNIGHT_STEPS,
+    LINE,
+    PAWN_MASK,
+    ROOK_RAYS,
+)
+
+
+class WDL(IntEnum):
+    LOSS = -1
+    DRAW = 0
+    WIN = 1
+
+
+# Extra material of the strong side, in table order.  The strong side always
+# plays upwards ("white") inside a table; probes mirror the board otherwise.
+ENDINGS: dict[str, tuple[Type, ...]] = {
+    "KQK": (Type.QUEEN,),
+    "KRK": (Type.ROOK,),
+    "KBNK": (Type.BISHOP, Type.KNIGHT),
+    "KPK": (Type.PAWN,),
+}
+
+# Tables a generator needs to resolve promotions.
+DEPENDS: dict[str, tuple[str, ...]] = {"KPK": ("KQK", "KRK")}
+PROMOTIONS: dict[str, tuple[tuple[Type, str], ...]] = {
+    "KPK": ((Type.QUEEN, "KQK"), (Type.ROOK, "KRK")),
+}
+
+MAGIC = b"BBS1"
+HEADER = struct.Struct("<4s8s")
+
+UNKNOWN, WON, DRAWN, INVALID = 0, 1, 2, 3
+FILE_MIRROR = 0b111000
+RANK_MIRROR = 0b000111
+
+
+def _attacks(ptype: Type, src: int, dst: int, occ: int) -> bool:
+    if ptype == Type.KNIGHT:
+        return (KNIGHT_MASK[src] >> dst) & 1 == 1
+    if ptype == Type.PAWN:
+        return (PAWN_MASK[src] >> dst) & 1 == 1
+    line = LINE[src][dst]
+    if line == 0 or BETWEEN[src][dst] & occ:
+        return False
+    return ptype == Type.QUEEN or line == (1 if ptype == Type.ROOK else 2)
+
+
+def _retreats(ptype: Type, src: int, occ: int) -> list[int]:
+    if ptype == Type.KNIGHT:
+        return [t for t in KNIGHT_STEPS[src] if not (occ >> t) & 1]
+    if ptype == Type.KING:
+        return [t for t in KING_STEPS[src] if not (occ >> t) & 1]
+    if ptype == Type.PAWN:
+        rank = src & 7
+        if rank < 2 or (occ >> (src - 1)) & 1:
+            return []
+        if rank == 3 and not (occ >> (src - 2)) & 1:
+            return [src - 1, src - 2]
+        return [src - 1]
+
+    rays: list[list[int]] = []
+    if ptype in (Type.ROOK, Type.QUEEN):
+        rays += ROOK_RAYS[src]
+    if ptype in (Type.BISHOP, Type.QUEEN):
+        rays += BISHOP_RAYS[src]
+    result: list[int] = []
+    for ray in rays:
+        for t in ray:
+            if (occ >> t) & 1:
+                break
+            result.append(t)
+    return result
+
+
+class Layout:
+    """Index layout of one ending.
+
+    A position is ``(stm, strong king, weak king, *extras)`` where ``stm`` is
+    0 when the strong side is to move.  The strong king is confined to the
+    a–d files (and ranks 1–4 for pawnless endings) by mirroring the board.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.extras = ENDINGS[name]
+        self.npieces = 2 + len(self.extras)
+        self.mirror_ranks = Type.PAWN not in self.extras
+        self.kranks = 4 if self.mirror_ranks else 8
+        self.block = 64 ** (self.npieces - 1)
+        self.size = 2 * 4 * self.kranks * self.block
+
+    def canonical(self, sqs: list[int]) -> list[int]:
+        flip = 0
+        if sqs[0] & FILE_MIRROR >= 32:
+            flip |= FILE_MIRROR
+        if self.mirror_ranks and sqs[0] & RANK_MIRROR >= 4:
+            flip |= RANK_MIRROR
+        if flip:
+            return [s ^ flip for s in sqs]
+        return sqs
+
+    def index(self, stm: int, sqs: list[int]) -> int:
+        sqs = self.canonical(sqs)
+        king = sqs[0]
+        idx = stm * 4 * self.kranks + (king >> 3) * self.kranks + (king & 7)
+        for s in sqs[1:]:
+            idx = (idx << 6) | s
+        return idx
+
+    def positions(self) -> Iterator[tuple[int, ...]]:
+        kings = [(f << 3) | r for f in range(4) for r in range(self.kranks)]
+        return product(kings, *([range(64)] * (self.npieces - 1)))
+
+
+def _is_valid(layout: Layout, stm: int, sqs: list[int] | tuple[int, ...]) -> bool:
+    if len(set(sqs)) != len(sqs):
+        return False
+    sk, wk = sqs[0], sqs[1]
+    if (KING_MASK[sk] >> wk) & 1:
+        return False
+    for ptype, s in zip(layout.extras, sqs[2:]):
+        if ptype == Type.PAWN and (s & 7) in (0, 7):
+            return False
+    if stm == 0:
+        occ = sum(1 << s for s in sqs)
+        for ptype, s in zip(layout.extras, sqs[2:]):
+            if _attacks(ptype, s, wk, occ):
+                return False
+    return True
+
+
+def _weak_moves(layout: Layout, sqs: tuple[int, ...]) -> tuple[int, bool, bool]:
+    """Count legal quiet king moves of the weak side.
+
+    Returns ``(moves, escapes, in_check)``; ``escapes`` is set when the weak
+    king can safely capture a piece, which always leaves a drawn ending.
+    """
+    sk, wk = sqs[0], sqs[1]
+    pieces = list(zip(layout.extras, sqs[2:]))
+    occ = sum(1 << s for s in sqs)
+    in_check = any(_attacks(p, s, wk, occ) for p, s in pieces)
+
+    moves = 0
+    for t in KING_STEPS[wk]:
+        if t == sk or (KING_MASK[sk] >> t) & 1:
+            continue
+        after = (occ ^ (1 << wk)) | (1 << t)
+        if any(s != t and _attacks(p, s, t, after) for p, s in pieces):
+            continue
+        if (occ >> t) & 1:
+            return moves, True, in_check
+        moves += 1
+    return moves, False, in_check
+
+
+def generate(name: str, solved: Optional[dict[str, bytearray]] = None) -> bytearray:
+    """Solve ``name`` by retrograde analysis and return its state array."""
+    layout = Layout(name)
+    solved = solved if solved is not None else {}
+    for dep in DEPENDS.get(name, ()):
+        if dep not in solved:
+            solved[dep] = generate(dep, solved)
+
+    state = bytearray(layout.size)
+    counts = bytearray(layout.size)
+    queue = array("Q")
+    half = layout.size // 2
+
+    for stm in (0, 1):
+        for idx, sqs in enumerate(layout.positions(), stm * half):
+            if not _is_valid(layout, stm, sqs):
+                state[idx] = INVALID
+                continue
+            if stm == 0:
+                if _promotes(layout, sqs, solved):
+                    state[idx] = WON
+                    queue.append(idx)
+                continue
+            moves, escapes, in_check = _weak_moves(layout, sqs)
+            if escapes or (moves == 0 and not in_check):
+                state[idx] = DRAWN
+            elif moves == 0:
+                state[idx] = WON
+                queue.append(idx)
+            else:
+                counts[idx] = moves
+
+    head = 0
+    while head < len(queue):
+        idx = queue[head]
+        head += 1
+        stm, sqs = _decode(layout, idx)
+        occ = sum(1 << s for s in sqs)
+
+        if stm == 1:
+            # Weak side lost here: every strong move leading here wins.
+            for i, ptype in enumerate((Type.KING, Type.KING) + layout.extras):
+                if i == 1:
+                    continue
+                for src in _retreats(ptype, sqs[i], occ):
+                    prev = list(sqs)
+                    prev[i] = src
+                    pidx = layout.index(0, prev)
+                    if state[pidx] == UNKNOWN:
+                        state[pidx] = WON
+                        queue.append(pidx)
+        else:
+            # One more weak king move is refuted.
+            for src in _retreats(Type.KING, sqs[1], occ):
+                prev = list(sqs)
+                prev[1] = src
+                pidx = layout.index(1, prev)
+                if state[pidx] == UNKNOWN:
+                    counts[pidx] -= 1
+                    if counts[pidx] == 0:
+                        state[pidx] = WON
+                        queue.append(pidx)
+
+    return state
+
+
+def _decode(layout: Layout, idx: int) -> tuple[int, list[int]]:
+    sqs: list[int] = []
+    for _ in range(layout.npieces - 1):
+        sqs.append(idx & 63)
+        idx >>= 6
+    stm, king = divmod(idx, 4 * layout.kranks)
+    sqs.append(((king // layout.kranks) << 3) | (king % layout.kranks))
+    sqs.reverse()
+    return stm, sqs
+
+
+def _promotes(
+    layout: Layout, sqs: tuple[int, ...], solved: dict[str, bytearray]
+) -> bool:
+    for i, ptype in enumerate(layout.extras, 2):
+        if ptype != Type.PAWN or sqs[i] & 7 != 6 or (sqs[i] + 1) in sqs:
+            continue
+        for promoted, table in PROMOTIONS[layout.name]:
+            target = Layout(table)
+            # Promoted material replaces the pawn in the target table order.
+            rest = [s for j, s in enumerate(sqs[2:], 2) if j != i]
+            new = [sqs[0], sqs[1], *rest]
+            new.insert(2 + target.extras.index(promoted), sqs[i] + 1)
+            if solved[table][target.index(1, new)] == WON:
+                return True
+    return False
+
+
+def pack(state: bytearray) -> bytes:
+    bits = bytearray((len(state) + 7) // 8)
+    for idx, value in enumerate(state):
+        if value == WON:
+            bits[idx >> 3] |= 1 << (idx & 7)
+    return bytes(bits)
+
+
+def build(directory: str, names: Optional[list[str]] = None) -> list[str]:
+    """Generate bitbase files for ``names`` into ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    solved: dict[str, bytearray] = {}
+    paths: list[str] = []
+    for name in names or list(ENDINGS):
+        if name not in ENDINGS:
+            raise ValueError(f"Unknown ending: {name}")
+        if name not in solved:
+            solved[name] = generate(name, solved)
+        path = os.path.join(directory, f"{name}.bb")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, name.encode()))
+            f.write(pack(solved[name]))
+        paths.append(path)
+    return paths
+
+
+class Bitbase:
+    """Read-only, memory-mapped view of one generated bitbase file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, name = HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError(f"Not a bitbase file: {path}")
+        self.layout = Layout(name.rstrip(b"\0").decode())
+
+    def is_win(self, stm: int, sqs: list[int]) -> bool:
+        idx = self.layout.index(stm, sqs)
+        return (self.mm[HEADER.size + (idx >> 3)] >> (idx & 7)) & 1 == 1
+
+    def close(self) -> None:
+        self.mm.close()
+
+
+class Bitbases:
+    def __init__(self, directory: str) -> None:
+        self.tables: dict[str, Bitbase] = {}
+        for name in ENDINGS:
+            path = os.path.join(directory, f"{name}.bb")
+            if os.path.exists(path):
+                self.tables[name] = Bitbase(path)
+
+    def probe(self, board: Board, color: Color) -> Optional[WDL]:
+        """Result for the side ``color`` to move, or None if not covered."""
+        strong: Optional[Color] = None
+        extras: list[tuple[Type, Square]] = []
+        for t in Type:
+            if t == Type.KING:
+                continue
+            for c in Color:
+                for p in board.pieces[t | c]:
+                    if strong is not None and strong != c:
+                        return None
+                    strong = c
+                    extras.append((t, p.loc))
+                    if len(extras) > 2:
+                        return None
+        if strong is None:
+            return WDL.DRAW
+
+        ptypes = tuple(t for t, _ in extras)
+        name = next((n for n, e in ENDINGS.items() if sorted(e) == sorted(ptypes)), None)
+        if name is None:
+            return WDL.DRAW if ptypes in ((Type.BISHOP,), (Type.KNIGHT,)) else None
+        table = self.tables.get(name)
+        if table is None:
+            return None
+
+        flip = RANK_MIRROR if strong == Color.BLACK else 0
+        sqs = [
+            board.get_king(strong).loc ^ flip,
+            board.get_king(strong.other).loc ^ flip,
+        ]
+        for ptype in ENDINGS[name]:
+            sqs.append(next(loc for t, loc in extras if t == ptype) ^ flip)
+
+        stm = 0 if color == strong else 1
+        if not table.is_win(stm, sqs):
+            return WDL.DRAW
+        return WDL.WIN if stm == 0 else WDL.LOSS
+
+    def close(self) -> None:
+        for table in self.tables.values():
+            table.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build endgame bitbases.")
+    parser.add_argument("directory")
+    parser.add_argument("endings", nargs="*", help=f"any of {', '.join(ENDINGS)}")
+    args = parser.parse_args()
+    for path in build(args.directory, args.endings or None):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
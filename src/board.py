@@ -2,6 +2,7 @@ from typing import Iterator, Optional
 
 from .piece import Color, Piece, Type
 from .square import Square
+from .zobrist import PIECE_KEYS
 
 
 class AttackBoard:
@@ -31,6 +32,9 @@ class Board:
         self.board: list[Piece | None] = [None] * size
         self.pinned: list[Piece] = []
         self.pieces: list[list[Piece]] = [[] for _ in range(2 * max(Type))]
+        self.hash = 0
+        # Zobrist key of the pawns alone, for the pawn structure cache.
+        self.pawn_hash = 0
 
     def is_empty(self, loc: Square) -> bool:
         return self.board[loc] is None
@@ -38,14 +42,24 @@ class Board:
     def put_piece(self, piece: Piece, loc: Square) -> None:
         self.board[loc] = piece
         self.pieces[piece.id].append(piece)
+        self.hash ^= PIECE_KEYS[piece.id][loc]
+        if piece.id & 14 == Type.PAWN:
+            self.pawn_hash ^= PIECE_KEYS[piece.id][loc]
 
     def remove_piece(self, piece: Piece) -> None:
         self.board[piece.loc] = None
         self.pieces[piece.id].remove(piece)
+        self.hash ^= PIECE_KEYS[piece.id][piece.loc]
+        if piece.id & 14 == Type.PAWN:
+            self.pawn_hash ^= PIECE_KEYS[piece.id][piece.loc]
 
     def move_piece(self, piece: Piece, loc: Square) -> None:
         self.board[piece.loc] = None
         self.board[loc] = piece
+        delta = PIECE_KEYS[piece.id][piece.loc] ^ PIECE_KEYS[piece.id][loc]
+        self.hash ^= delta
+        if piece.id & 14 == Type.PAWN:
+            self.pawn_hash ^= delta
         piece.move(loc)
 
     def get_piece(self, loc: Square) -> Optional[Piece]:
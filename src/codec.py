@@ -0,0 +1,122 @@
+import struct
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from .piece import Color, side_to_move
+from .square import Square
+
+if TYPE_CHECKING:
+    from .engine import Engine
+
+# One position: 64 nibbles (piece id + 1, 0 for empty) in square order, a
+# flags byte (bit 0: black to move; bits 1-4 reserved for castling rights,
+# which the engine does not play), the en passant pawn's square or NO_EP,
+# and the halfmove clock.
+RECORD = struct.Struct("<32sBBH")
+SIZE = RECORD.size
+NO_EP = 0xFF
+
+_LETTERS = "PpNnBbRrQqKk"
+_NIBBLE = {letter: i + 1 for i, letter in enumerate(_LETTERS)}
+_CHARS = "." + _LETTERS
+# Both nibbles of every byte value, low (even square) first.
+_PAIRS: list[tuple[int, int]] = [(b & 15, b >> 4) for b in range(256)]
+
+
+def encode(engine: "Engine", color: Color) -> bytes:
+    """Pack the position in ``engine`` with ``color`` to move."""
+    ids = [0 if p is None else p.id + 1 for p in engine.board.board]
+    board = bytes([ids[i] | ids[i + 1] << 4 for i in range(0, 64, 2)])
+    ep = engine.ep_candidate
+    return RECORD.pack(
+        board, int(color), NO_EP if ep is None else ep.loc, engine.halfmove_clock
+    )
+
+
+def from_fen(fen: str) -> bytes:
+    """Pack a FEN without building an engine."""
+    fields = fen.split(" ")
+    ids = [0] * 64
+    for r, row in enumerate(fields[0].split("/")):
+        file = 0
+        for char in row:
+            if char.isdigit():
+                file += int(char)
+            else:
+                if char not in _NIBBLE:
+                    raise ValueError("Invalid Notation")
+                ids[(file << 3) | (7 - r)] = _NIBBLE[char]
+                file += 1
+    board = bytes([ids[i] | ids[i + 1] << 4 for i in range(0, 64, 2)])
+    color = side_to_move(fen)
+    ep = NO_EP
+    if len(fields) > 3 and fields[3] != "-":
+        target = Square.from_notation(fields[3])
+        # The pawn stands one rank past the square it skipped.
+        ep = target + (1 if target.rank == 2 else -1)
+    clock = int(fields[4]) if len(fields) > 4 else 0
+    return RECORD.pack(board, color, ep, clock)
+
+
+def _to_fen(board: bytes, flags: int, ep: int, clock: int) -> str:
+    chars = [_CHARS[n] for b in board for n in _PAIRS[b]]
+    # Squares are file-major, so every eighth entry is one rank.
+    rows = "/".join("".join(chars[rank::8]) for rank in range(7, -1, -1))
+    for run in range(8, 0, -1):
+        rows = rows.replace("." * run, str(run))
+    side = "b" if flags & 1 else "w"
+    if ep == NO_EP:
+        target = "-"
+    else:
+        pawn = Square(ep)
+        target = str(Square(pawn - 1 if pawn.rank == 3 else pawn + 1))
+    return f"{rows} {side} - {target} {clock} 1"
+
+
+def to_fen(data: bytes) -> str:
+    """Unpack one position to FEN (castling "-", fullmove number 1)."""
+    return _to_fen(*RECORD.unpack(data))
+
+
+def side(data: bytes) -> Color:
+    return Color(data[32] & 1)
+
+
+def pieces(data: bytes) -> Iterator[tuple[Square, int]]:
+    """Square and piece id of every piece in a packed position, in FEN
+    order so that piece lists come out as from the FEN."""
+    for rank in range(7, -1, -1):
+        for file in range(8):
+            sq = file << 3 | rank
+            nibble = data[sq >> 1] >> 4 * (sq & 1) & 15
+            if nibble:
+                yield Square(sq), nibble - 1
+
+
+def ep_pawn(data: bytes) -> Optional[Square]:
+    """Square of the pawn that may be taken en passant, if any."""
+    return None if data[33] == NO_EP else Square(data[33])
+
+
+def encode_batch(positions: Iterable[bytes]) -> bytes:
+    """Concatenate packed positions into one buffer of ``SIZE``-byte records."""
+    return b"".join(positions)
+
+
+def fens_to_batch(fens: Iterable[str]) -> bytes:
+    return encode_batch(from_fen(fen) for fen in fens)
+
+
+def iter_batch(buffer: bytes | bytearray | memoryview) -> Iterator[bytes]:
+    """Packed positions of a batch buffer, sliced without copying the rest."""
+    view = memoryview(buffer)
+    if len(view) % SIZE:
+        raise ValueError(f"Batch length {len(view)} is not a multiple of {SIZE}")
+    for offset in range(0, len(view), SIZE):
+        yield view[offset : offset + SIZE].tobytes()
+
+
+def batch_to_fens(buffer: bytes | bytearray | memoryview) -> Iterator[str]:
+    if len(buffer) % SIZE:
+        raise ValueError(f"Batch length {len(buffer)} is not a multiple of {SIZE}")
+    for record in RECORD.iter_unpack(buffer):
+        yield _to_fen(*record)
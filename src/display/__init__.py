@@ -1,4 +1,5 @@
-from typing import Protocol
+import importlib
+from typing import Any, Callable, Protocol
 
 from src.board import Board
 from src.piece import Color
@@ -10,8 +11,38 @@ class UI(Protocol):
         self, board: Board, side: Color, highlight: list[Square] | None = None
     ) -> None: ...
 
-    def get_input(self, query: str) -> str: ...
-
     def show_err(self, message: str) -> None: ...
 
     def show_end_result(self, message: str) -> None: ...
+
+    def run(
+        self, on_input: Callable[[str], bool], prompt: Callable[[], str]
+    ) -> None:
+        """Deliver user input to ``on_input`` until it returns False.
+
+        ``prompt`` gives the text to show for the next input, for front ends
+        that ask for it.
+        """
+        ...
+
+    def background(self, work: Callable[[], Any], done: Callable[[Any], None]) -> None:
+        """Call ``work`` without blocking the input loop, then ``done`` with
+        its result on the input loop's thread.
+
+        Front ends whose input loop blocks anyway may call both in turn.
+        """
+        ...
+
+
+# Back ends are imported on first use, so headless runs never load tkinter.
+DISPLAYS: dict[str, tuple[str, str]] = {
+    "tk": ("src.display.gui", "TkDisplay"),
+    "term": ("src.display.term", "TermDisplay"),
+}
+
+
+def create_display(name: str) -> UI:
+    if name not in DISPLAYS:
+        raise ValueError(f"Unknown display: {name}")
+    module, cls = DISPLAYS[name]
+    return getattr(importlib.import_module(module), cls)()
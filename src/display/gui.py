@@ -1,5 +1,6 @@
+import threading
 import tkinter as tk
-from typing import Optional, cast
+from typing import Any, Callable, Optional, cast
 
 from src.board import Board
 from src.piece import Color, Piece
@@ -17,8 +18,7 @@ class TkDisplay:
     def __init__(self) -> None:
         self.board_widget: Optional[Board] = None
         self.side = Color.WHITE
-        self.input_queue: list[str] = []
-        self.waiting_for_input = False
+        self.on_input: Optional[Callable[[str], bool]] = None
 
         self.root = tk.Tk()
         self.root.title("Chess Engine")
@@ -58,15 +58,26 @@ class TkDisplay:
         self.canvas.bind("<Button-1>", self._on_board_click)
         self.is_running = True
 
+        # Last drawn (fill, dot, glyph, glyph colour) per screen cell.
+        self.square_items: list[tuple[int, int, int]] = []
+        self.drawn: list[Optional[tuple[str, bool, str, str]]] = [None] * 64
+        self.labels_side: Optional[Color] = None
+        self._create_squares()
+
     def _close(self) -> None:
+        if not self.is_running:
+            return
         self.is_running = False
         self.root.destroy()
-        self.input_queue.append("exit")
+
+    def _dispatch(self, value: str) -> None:
+        if self.on_input is not None and not self.on_input(value):
+            self._close()
 
     def _restart(self, event: tk.Event) -> None:
-        self.input_queue.append("restart")
         btn = cast(tk.Button, event.widget)
         btn.master.destroy()
+        self._dispatch("restart")
 
     def _get_piece_symbol(self, piece: Piece) -> str:
         symbols = {
@@ -79,57 +90,36 @@ class TkDisplay:
         }
         return symbols[piece.notation][piece.color]
 
-    def _draw_board(self, board: Board, highlight: list[Square]) -> None:
-        self.canvas.delete("all")
-        self.rank_canvas.delete("all")
-        self.file_canvas.delete("all")
-
+    def _create_squares(self) -> None:
+        # One rectangle, dot and glyph per screen cell, reconfigured in place.
+        radius = SQUARE_SIZE / 6
         for r in range(8):
             for f in range(8):
-                rank = 7 - r if self.side == Color.WHITE else r
-                file = 7 - f if self.side == Color.BLACK else f
-                loc = (file << 3) | rank
-
                 x1 = f * SQUARE_SIZE
                 y1 = r * SQUARE_SIZE
-                x2 = x1 + SQUARE_SIZE
-                y2 = y1 + SQUARE_SIZE
-
-                is_light = (file + rank) % 2 == 0
-                is_highlighted = loc in highlight
-
-                if is_highlighted:
-                    color = HIGHLIGHT_COLOR
-                else:
-                    color = LIGHT_SQUARE if is_light else DARK_SQUARE
-
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="")
-
-                piece = board.board[loc]
-
-                if is_highlighted and piece is None:
-                    cx = (x1 + x2) / 2
-                    cy = (y1 + y2) / 2
-                    radius = SQUARE_SIZE / 6
-                    self.canvas.create_oval(
-                        cx - radius,
-                        cy - radius,
-                        cx + radius,
-                        cy + radius,
-                        fill=DOT_COLOR,
-                        outline="",
-                    )
-                elif piece is not None:
-                    symbol = self._get_piece_symbol(piece)
-                    piece_color = "white" if piece.color == Color.WHITE else "black"
-
-                    self.canvas.create_text(
-                        (x1 + x2) / 2,
-                        (y1 + y2) / 2,
-                        text=symbol,
-                        font=("Arial", int(SQUARE_SIZE * 0.6)),
-                        fill=piece_color,
-                    )
+                cx = x1 + SQUARE_SIZE / 2
+                cy = y1 + SQUARE_SIZE / 2
+
+                rect = self.canvas.create_rectangle(
+                    x1, y1, x1 + SQUARE_SIZE, y1 + SQUARE_SIZE, outline=""
+                )
+                dot = self.canvas.create_oval(
+                    cx - radius,
+                    cy - radius,
+                    cx + radius,
+                    cy + radius,
+                    fill=DOT_COLOR,
+                    outline="",
+                    state=tk.HIDDEN,
+                )
+                glyph = self.canvas.create_text(
+                    cx, cy, text="", font=("Arial", int(SQUARE_SIZE * 0.6))
+                )
+                self.square_items.append((rect, dot, glyph))
+
+    def _draw_labels(self) -> None:
+        self.rank_canvas.delete("all")
+        self.file_canvas.delete("all")
 
         file_labels = "abcdefgh"
         if self.side == Color.BLACK:
@@ -152,6 +142,49 @@ class TkDisplay:
                 font=("Arial", 14),
             )
 
+        self.labels_side = self.side
+
+    def _draw_board(self, board: Board, highlight: list[Square]) -> None:
+        if self.labels_side != self.side:
+            self._draw_labels()
+
+        highlight_set = set(highlight)
+
+        for r in range(8):
+            for f in range(8):
+                rank = 7 - r if self.side == Color.WHITE else r
+                file = 7 - f if self.side == Color.BLACK else f
+                loc = (file << 3) | rank
+
+                is_light = (file + rank) % 2 == 0
+                is_highlighted = loc in highlight_set
+
+                if is_highlighted:
+                    color = HIGHLIGHT_COLOR
+                else:
+                    color = LIGHT_SQUARE if is_light else DARK_SQUARE
+
+                piece = board.board[loc]
+                if piece is None:
+                    cell = (color, is_highlighted, "", "")
+                else:
+                    piece_color = "white" if piece.color == Color.WHITE else "black"
+                    cell = (color, False, self._get_piece_symbol(piece), piece_color)
+
+                idx = r * 8 + f
+                prev = self.drawn[idx]
+                if prev == cell:
+                    continue
+
+                rect, dot, glyph = self.square_items[idx]
+                if prev is None or prev[0] != cell[0]:
+                    self.canvas.itemconfig(rect, fill=cell[0])
+                if prev is None or prev[1] != cell[1]:
+                    self.canvas.itemconfig(dot, state=tk.NORMAL if cell[1] else tk.HIDDEN)
+                if prev is None or prev[2:] != cell[2:]:
+                    self.canvas.itemconfig(glyph, text=cell[2], fill=cell[3] or "black")
+                self.drawn[idx] = cell
+
     def _on_board_click(self, event: tk.Event) -> None:
         self.message_label.config(text="")
         f = event.x // SQUARE_SIZE
@@ -164,9 +197,7 @@ class TkDisplay:
         file = 7 - f if self.side == Color.BLACK else f
 
         value = f"{chr(file + ord('a'))}{rank + 1}"
-        if self.waiting_for_input:
-            self.input_queue.append(value)
-            self.waiting_for_input = False
+        self._dispatch(value)
 
     def show_board(
         self,
@@ -177,24 +208,35 @@ class TkDisplay:
         self.side = side
         highlight = highlight if highlight is not None else []
         self._draw_board(board, highlight)
-        self.root.update()
-
-    def get_input(self, query: str) -> str:
-        if not self.is_running:
-            return "exit"
+        self.root.update_idletasks()
 
-        self.waiting_for_input = True
-
-        while not self.input_queue:
-            self.root.update()
-            self.root.update_idletasks()
-
-        result = self.input_queue.pop(0)
-        return result
+    def run(
+        self, on_input: Callable[[str], bool], prompt: Callable[[], str]
+    ) -> None:
+        # Clicks arrive as Tk events, so the window sleeps in mainloop()
+        # between them instead of polling for input.
+        self.on_input = on_input
+        if self.is_running:
+            self.root.mainloop()
+
+    def background(self, work: Callable[[], Any], done: Callable[[Any], None]) -> None:
+        # The worker posts its result back with after(), which Tk runs on
+        # the mainloop thread; it is started from the loop so that loop is
+        # already running when the result arrives.
+        def run() -> None:
+            result = work()
+            if self.is_running:
+                try:
+                    self.root.after(0, done, result)
+                except (RuntimeError, tk.TclError):
+                    pass  # the window was closed meanwhile
+
+        thread = threading.Thread(target=run, daemon=True)
+        self.root.after_idle(thread.start)
 
     def show_err(self, message: str) -> None:
         self.message_label.config(text=f"Error: {message}", fg="red")
-        self.root.update()
+        self.root.update_idletasks()
 
     def show_end_result(self, message: str) -> None:
         banner_frame = tk.Frame(self.root, bg="#f0f0f0", bd=5, relief=tk.RAISED)
@@ -228,4 +270,4 @@ class TkDisplay:
         btn_restart.grid(row=1, column=2)
         btn_restart.bind("<Button-1>", self._restart)
 
-        self.root.update()
+        self.root.update_idletasks()
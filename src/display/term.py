@@ -1,3 +1,6 @@
+import sys
+from typing import Any, Callable, Optional, TextIO
+
 from src.board import Board
 from src.piece import Color, Piece
 from src.square import Square
@@ -12,6 +15,15 @@ ERROR_MSG = "\033[38;5;196m"
 SUCCESS_MSG = "\033[38;5;82m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
+CLEAR_SCREEN = "\033[H\033[2J"
+CLEAR_BELOW = "\033[J"
+CLEAR_LINE = "\033[2K"
+
+# Screen layout of a frame in diff mode (1-based rows and columns).
+FIRST_RANK_ROW = 3
+FIRST_CELL_COL = 4
+MESSAGE_ROW = 21
+PROMPT_ROW = 22
 
 PIECE_SYMBOLS = {
     "K": ("♚", "♔"),
@@ -24,8 +36,27 @@ PIECE_SYMBOLS = {
 
 
 class TermDisplay:
-    def __init__(self, use_ascii: bool = True) -> None:
+    """Terminal front end.
+
+    With ``diff=True`` (the default when ``out`` is a terminal) the board
+    stays at the top of the screen and each frame only rewrites the cells
+    that changed since the previous one, using ANSI cursor positioning;
+    every frame is one write and one flush.  A message stays on its row
+    until the next input is read.
+    """
+
+    def __init__(
+        self,
+        use_ascii: bool = True,
+        diff: Optional[bool] = None,
+        out: TextIO = sys.stdout,
+    ) -> None:
         self.use_ascii = use_ascii
+        self.diff = out.isatty() if diff is None else diff
+        self.out = out
+        self.message = ""
+        self.prev_cells: Optional[list[str]] = None
+        self.prev_side: Optional[Color] = None
 
     def get_symbol(self, piece: Piece) -> str:
         if self.use_ascii:
@@ -35,30 +66,50 @@ class TermDisplay:
             return PIECE_SYMBOLS[piece.notation][piece.color]
 
     def get_input(self, query: str) -> str:
-        return input(query).strip()
+        try:
+            value = input(query).strip()
+        except EOFError:
+            return "exit"
+        if self.diff and self.message:
+            self.message = ""
+            self._write(f"\033[{MESSAGE_ROW};1H{CLEAR_LINE}")
+        return value
+
+    def run(
+        self, on_input: Callable[[str], bool], prompt: Callable[[], str]
+    ) -> None:
+        while on_input(self.get_input(prompt())):
+            pass
+
+    def background(self, work: Callable[[], Any], done: Callable[[Any], None]) -> None:
+        # input() blocks between moves, so there is nothing to keep responsive.
+        done(work())
+
+    def _write(self, text: str) -> None:
+        self.out.write(text)
+        self.out.flush()
+
+    def _show_message(self, message: str) -> None:
+        if self.diff:
+            self.message = message
+            self._write(
+                f"\033[{MESSAGE_ROW};1H{CLEAR_LINE}{message}"
+                f"\033[{PROMPT_ROW};1H{CLEAR_BELOW}"
+            )
+        else:
+            self._write(f"{message}\n")
 
     def show_err(self, message: str) -> None:
-        print(f"{ERROR_MSG}{message}{RESET}")
+        self._show_message(f"{ERROR_MSG}{message}{RESET}")
 
     def show_end_result(self, message: str) -> None:
-        print(f"{SUCCESS_MSG}{message}{RESET}")
-
-    def show_board(
-        self,
-        board: Board,
-        side: Color = Color.WHITE,
-        highlight: list[Square] | None = None,
-    ) -> None:
-        if highlight is None:
-            highlight = []
-
-        highlight_set = set(highlight)
-
-        print("\n  ╔═══╤═══╤═══╤═══╤═══╤═══╤═══╤═══╗")
+        self._show_message(f"{SUCCESS_MSG}{message}{RESET}")
 
+    def _cells(self, board: Board, side: Color, highlight: set[Square]) -> list[str]:
+        """Rendered cells in screen order, top-left to bottom-right."""
+        cells: list[str] = []
         for r in range(7, -1, -1):
             rank = 7 - r if side == Color.BLACK else r
-            row = f"{rank + 1} ║"
 
             for f in range(8):
                 file = 7 - f if side == Color.BLACK else f
@@ -66,7 +117,7 @@ class TermDisplay:
                 piece = board.board[loc]
 
                 is_light_square = (file + rank) % 2 == 0
-                is_highlighted = loc in highlight_set
+                is_highlighted = loc in highlight
 
                 if is_highlighted:
                     bg = HIGHLIGHT_BG
@@ -85,20 +136,52 @@ class TermDisplay:
                         symbol = self.get_symbol(piece)
                         color = BLACK_PIECE if piece.color else WHITE_PIECE
 
-                row += f"{bg}{BOLD} {color}{symbol} {RESET}"
-
-                if f < 7:
-                    row += "│"
+                cells.append(f"{bg}{BOLD} {color}{symbol} {RESET}")
+        return cells
 
-            row += "║"
-            print(row)
+    def _frame(self, cells: list[str], side: Color) -> str:
+        lines = ["", "  ╔═══╤═══╤═══╤═══╤═══╤═══╤═══╤═══╗"]
 
-            if r > 0:
-                print("  ╟───┼───┼───┼───┼───┼───┼───┼───╢")
+        for i in range(8):
+            rank = i if side == Color.BLACK else 7 - i
+            lines.append(f"{rank + 1} ║" + "│".join(cells[8 * i : 8 * i + 8]) + "║")
+            if i < 7:
+                lines.append("  ╟───┼───┼───┼───┼───┼───┼───┼───╢")
 
-        print("  ╚═══╧═══╧═══╧═══╧═══╧═══╧═══╧═══╝")
+        lines.append("  ╚═══╧═══╧═══╧═══╧═══╧═══╧═══╧═══╝")
         file_names = "abcdefgh"
         if side == Color.BLACK:
             file_names = file_names[::-1]
-        print("   ", "   ".join(file_names))
-        print()
+        lines.append("    " + "   ".join(file_names))
+        lines.append("")
+        return "\n".join(lines) + "\n"
+
+    def show_board(
+        self,
+        board: Board,
+        side: Color = Color.WHITE,
+        highlight: list[Square] | None = None,
+    ) -> None:
+        cells = self._cells(board, side, set(highlight or []))
+
+        if not self.diff:
+            self._write(self._frame(cells, side))
+            return
+
+        if self.prev_cells is None or self.prev_side != side:
+            buf = [CLEAR_SCREEN, self._frame(cells, side)]
+            if self.message:
+                buf.append(f"\033[{MESSAGE_ROW};1H{self.message}")
+        else:
+            buf = []
+            for i, (cell, prev) in enumerate(zip(cells, self.prev_cells)):
+                if cell != prev:
+                    row = FIRST_RANK_ROW + 2 * (i >> 3)
+                    col = FIRST_CELL_COL + 4 * (i & 7)
+                    buf.append(f"\033[{row};{col}H{cell}")
+        # The message row is left alone: it is cleared when input is read.
+        buf.append(f"\033[{PROMPT_ROW};1H{CLEAR_BELOW}")
+
+        self.prev_cells = cells
+        self.prev_side = side
+        self._write("".join(buf))
@@ -1,28 +1,130 @@
-from typing import Iterator, Optional
+import copy
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
 
+from . import codec
+from .bitbase import WDL, Bitbases
 from .board import AttackBoard, Board
-from .piece import Color, Piece, Type
+from .movecache import MoveCache
+from .piece import (
+    Bishop,
+    Color,
+    King,
+    Knight,
+    Pawn,
+    Piece,
+    Queen,
+    Rook,
+    Type,
+    side_to_move,
+)
+from .piece.base import sign
 from .square import Square
+from .stats import EngineStats
+from .tables import BETWEEN, LINE
+from .zobrist import EP_KEYS, SIDE_KEY
+
+Move = tuple[Square, Square]
+
+# Exchange values for see(); a king can only be the last piece to capture.
+SEE_VALUES: dict[Type, int] = {
+    Type.PAWN: 100,
+    Type.KNIGHT: 320,
+    Type.BISHOP: 330,
+    Type.ROOK: 500,
+    Type.QUEEN: 900,
+    Type.KING: 20000,
+}
+SEE_BY_ID: list[int] = [SEE_VALUES[Type(i & 14)] for i in range(max(Type) + 2)]
+# LINE kinds a slider attacks along: 1 rank/file, 2 diagonal.
+SLIDER_LINES: dict[Type, tuple[int, ...]] = {
+    Type.BISHOP: (2,),
+    Type.ROOK: (1,),
+    Type.QUEEN: (1, 2),
+}
+# Piece class of each piece id (Type | Color).
+PIECE_CLASSES: list[type[Piece]] = [
+    cls for cls in (Pawn, Knight, Bishop, Rook, Queen, King) for _ in Color
+]
+
+
+@dataclass(frozen=True)
+class GameStatus:
+    nmoves: int
+    in_check: bool
+    # "checkmate", "stalemate", "threefold repetition" or "fifty-move rule".
+    result: Optional[str] = None
+
+    @property
+    def is_over(self) -> bool:
+        return self.result is not None
 
 
 class Engine:
-    def __init__(self, fen: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        fen: Optional[str] = None,
+        bitbases: Optional[Bitbases] = None,
+        packed: Optional[bytes] = None,
+    ) -> None:
         self.board = Board(64)
         self.fboard = AttackBoard(64)
         self.fen = fen or "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
         self.ep_candidate: Optional[Piece] = None
         self.pinned_or_checked: dict[Piece, list[Piece]] = {}
+        self.bitbases = bitbases
+        self.undo_stack: list[tuple[Any, ...]] = []
+        self.stats_collector: Optional[EngineStats] = None
+        # Legal moves of visited positions, possibly shared between engines.
+        self.move_cache: Optional[MoveCache] = None
+        # Bumped on every change of position; cached status entries from an
+        # older generation are stale.
+        self.generation = 0
+        self.status_cache: dict[Color, tuple[int, GameStatus]] = {}
+
+        fields = self.fen.split(" ")
+        self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        # Keys of every position reached so far, with occurrence counts, so
+        # repetition checks are a dict lookup instead of a board comparison.
+        self.key_history: list[int] = []
+        self.key_counts: dict[int, int] = {}
+
+        # ``packed`` is ``fen`` in the codec encoding, whose pieces are placed
+        # directly instead of parsing the FEN's board.
+        if packed is None:
+            self.load_fen(self.fen)
+        else:
+            self.load_packed(packed)
+        self._build_attacks()
 
-        self.load_fen(self.fen)
+        self.record_position(side_to_move(self.fen))
 
+    def _build_attacks(self) -> None:
         for piece in self.board.get_all_pieces(Color.WHITE):
             self.update_fboard(piece)
 
         for piece in self.board.get_all_pieces(Color.BLACK):
             self.update_fboard(piece)
 
+        for color in Color:
+            self.update_fboard(self.board.get_king(color))
+        self.handle_checks()
+
+        if self.ep_candidate is not None:
+            # The en passant capture was generated before the sliders that
+            # may pin it along the rank were on the attack board.
+            ep = self.ep_candidate
+            for p in self.ep_capturers(ep, ep.loc):
+                self.update_fboard(p)
+
     def reset(self) -> None:
-        Engine.__init__(self, self.fen)
+        stats = self.stats_collector
+        move_cache = self.move_cache
+        self.disable_stats()
+        Engine.__init__(self, self.fen, self.bitbases)
+        self.move_cache = move_cache
+        if stats is not None:
+            stats.install(self)
 
     def load_fen(self, fen: str) -> None:
         board_state = fen.split(" ")[0]
@@ -39,6 +141,42 @@ class Engine:
                     self.board.put_piece(piece, loc)
                     file += 1
 
+        fields = fen.split(" ")
+        if len(fields) > 3 and fields[3] != "-":
+            target = Square.from_notation(fields[3])
+            # The pawn that skipped ``target`` stands one rank further on.
+            pawn = self.board.get_piece(
+                Square(target + (1 if target.rank == 2 else -1))
+            )
+            if pawn is not None and pawn.type == Type.PAWN:
+                self.ep_candidate = pawn
+
+    def load_packed(self, data: bytes) -> None:
+        for loc, piece_id in codec.pieces(data):
+            self.board.put_piece(PIECE_CLASSES[piece_id](piece_id, loc), loc)
+        ep = codec.ep_pawn(data)
+        if ep is not None:
+            pawn = self.board.get_piece(ep)
+            if pawn is not None and pawn.type == Type.PAWN:
+                self.ep_candidate = pawn
+
+    def encode(self, color: Color) -> bytes:
+        """The position with ``color`` to move in ``codec.SIZE`` bytes."""
+        return codec.encode(self, color)
+
+    @classmethod
+    def decode(
+        cls, data: bytes, bitbases: Optional[Bitbases] = None
+    ) -> tuple["Engine", Color]:
+        """An engine for a position packed by :meth:`encode`, and the side
+        to move.  Game history is not encoded, so repetitions start over.
+
+        Pieces are placed straight from the packed squares; the FEN is only
+        rendered for :attr:`fen`.  With the legal backend building the
+        attack board still dominates the cost.
+        """
+        return cls(codec.to_fen(data), bitbases, data), codec.side(data)
+
     def get_piece(self, loc: Square) -> Optional[Piece]:
         return self.board.get_piece(loc)
 
@@ -46,9 +184,151 @@ class Engine:
         return self.board
 
     def nmoves(self, color: Color) -> int:
-        return sum(p.nmoves for p in self.board.get_all_pieces(color))
+        return self.status(color).nmoves
+
+    def status(self, color: Color) -> GameStatus:
+        """Legal move count, check and game result with ``color`` to move.
 
-    def _is_ep_pseudopinned(self, p1: Piece, p2: Piece, king: Piece) -> bool:
+        Computed at most once per position and served from the cache until
+        the next move.  With a :attr:`move_cache` the move count and check
+        flag of a revisited position come from there.
+        """
+        cached = self.status_cache.get(color)
+        if cached is not None and cached[0] == self.generation:
+            return cached[1]
+
+        if self.move_cache is not None:
+            nmoves, in_check = self.move_cache.counts(self, color)
+        else:
+            nmoves = self._count_moves(color)
+            in_check = self.in_check(color)
+        result = None
+        if nmoves == 0:
+            result = "checkmate" if in_check else "stalemate"
+        elif self.is_repetition():
+            result = "threefold repetition"
+        elif self.is_fifty_moves():
+            result = "fifty-move rule"
+
+        status = GameStatus(nmoves, in_check, result)
+        self.status_cache[color] = (self.generation, status)
+        return status
+
+    def _count_moves(self, color: Color) -> int:
+        nmoves = 0
+        for plist in self.board.pieces[color :: 2]:
+            for p in plist:
+                nmoves += p.nmoves
+        return nmoves
+
+    def in_check(self, color: Color) -> bool:
+        # handle_checks keeps the king entry in sync after every move.
+        return self.board.get_king(color) in self.pinned_or_checked
+
+    def key(self, color: Color) -> int:
+        """Zobrist key of the position with ``color`` to move."""
+        key = self.board.hash
+        if color == Color.BLACK:
+            key ^= SIDE_KEY
+        if self.ep_candidate is not None and self.can_capture_ep(color):
+            # As in FIDE repetition rules, the en passant square only
+            # tells positions apart when the capture can be made.
+            key ^= EP_KEYS[self.ep_candidate.loc.file]
+        return key
+
+    def can_capture_ep(self, color: Color) -> bool:
+        """Whether ``color`` has a legal en passant capture."""
+        ep = self.ep_candidate
+        if ep is None or ep.color == color:
+            return False
+        # The square the pawn skipped, one rank behind it.
+        target = ep.loc - 1 if color == Color.BLACK else ep.loc + 1
+        return any(p.moves >> target & 1 for p in self.ep_capturers(ep, ep.loc))
+
+    def record_position(self, to_move: Color) -> None:
+        key = self.key(to_move)
+        self.key_history.append(key)
+        self.key_counts[key] = self.key_counts.get(key, 0) + 1
+
+    def is_repetition(self, times: int = 3) -> bool:
+        """Whether the current position has occurred ``times`` times."""
+        return self.key_counts[self.key_history[-1]] >= times
+
+    def is_fifty_moves(self) -> bool:
+        return self.halfmove_clock >= 100
+
+    def is_draw(self) -> bool:
+        return self.is_repetition() or self.is_fifty_moves()
+
+    def gen_moves(self, color: Color) -> Iterator[Move]:
+        for piece in self.board.get_all_pieces(color):
+            for loc in Piece.bb_to_loc(piece.moves):
+                yield piece.loc, loc
+
+    def legal_moves(self, color: Color) -> list[Move]:
+        """Legal moves of ``color``, from :attr:`move_cache` when set."""
+        if self.move_cache is not None:
+            return self.move_cache.moves(self, color)
+        return list(self.gen_moves(color))
+
+    def enable_move_cache(self, size: int = 1 << 16) -> MoveCache:
+        if self.move_cache is None:
+            self.move_cache = MoveCache(size)
+        return self.move_cache
+
+    def gen_pseudo_moves(self, color: Color) -> Iterator[Move]:
+        """Candidate moves for :meth:`try_push`; a backend may include
+        moves that leave the king in check.  Here they are all legal."""
+        return self.gen_moves(color)
+
+    def refresh_attacks(self) -> None:
+        """Bring piece ``moves``/``ctrls`` and the attack board up to date.
+        This backend maintains them on every move."""
+
+    def copy(self) -> "Engine":
+        # Bitbases are read-only mmaps and, like the move cache, shared
+        # between copies; the instrumentation wrappers are bound to this
+        # instance, so the copy starts without them.
+        stats = self.stats_collector
+        if stats is not None:
+            stats.uninstall(self)
+        memo: dict[int, Any] = {
+            id(self.bitbases): self.bitbases,
+            id(self.move_cache): self.move_cache,
+        }
+        try:
+            clone = copy.deepcopy(self, memo)
+        finally:
+            if stats is not None:
+                stats.install(self)
+        return clone
+
+    def enable_stats(self) -> "EngineStats":
+        """Start counting and timing the phases of :meth:`move_piece`."""
+        if self.stats_collector is None:
+            EngineStats().install(self)
+        assert self.stats_collector is not None
+        return self.stats_collector
+
+    def disable_stats(self) -> None:
+        if self.stats_collector is not None:
+            self.stats_collector.uninstall(self)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of the collected phase statistics (empty when disabled)."""
+        if self.stats_collector is None:
+            return {}
+        return self.stats_collector.snapshot()
+
+    def probe(self, color: Color) -> Optional[WDL]:
+        """Bitbase result for ``color`` to move, if the ending is covered."""
+        if self.bitbases is None:
+            return None
+        return self.bitbases.probe(self.board, color)
+
+    def _is_ep_pseudopinned(
+        self, p1: Piece, p2: Piece, king: Piece, loc: Square
+    ) -> bool:
         for attacker in self.fboard.get_attackers(king.color.other, p1.loc):
             if not attacker.is_sliding:
                 continue
@@ -64,6 +344,12 @@ class Engine:
             if dir1 != dir2:
                 continue
 
+            # The capturing pawn landing on the line keeps it blocked.
+            if attacker.is_in_dir(loc) == dir1 and _distance(
+                attacker.loc, loc
+            ) < _distance(attacker.loc, king.loc):
+                continue
+
             ppin = True
             for i in self.iterate_between(p1, king):
                 target = self.board.get_piece(i)
@@ -79,10 +365,14 @@ class Engine:
             return not self.is_own(piece, loc)
 
         if not self.board.is_adj_file(piece.loc, loc):
+            if abs(piece.loc - loc) == 2:
+                skipped = Square((piece.loc + loc) // 2)
+                if not self.board.is_empty(skipped):
+                    return False
             return self.board.is_empty(loc)
 
         if not self.board.is_empty(loc):
-            return True
+            return not self.is_own(piece, loc)
 
         if self.ep_candidate is None or abs(piece.loc - self.ep_candidate.loc) != 8:
             return False
@@ -92,9 +382,9 @@ class Engine:
 
         # Check whether ep_candidate is can be taken without check
         king = self.board.get_king(piece.color)
-        if self._is_ep_pseudopinned(self.ep_candidate, piece, king):
+        if self._is_ep_pseudopinned(self.ep_candidate, piece, king, loc):
             return False
-        if self._is_ep_pseudopinned(piece, self.ep_candidate, king):
+        if self._is_ep_pseudopinned(piece, self.ep_candidate, king, loc):
             return False
         return True
 
@@ -102,18 +392,28 @@ class Engine:
         king = self.board.get_king(piece.color)
 
         if king not in self.pinned_or_checked:
-            return True
-
-        if len(self.pinned_or_checked[king]) != 1:
-            return piece.type == Type.KING and not self.is_threatened(piece, loc)
+            return piece.type != Type.KING or not self.is_threatened(piece, loc)
 
         if piece.type == Type.KING:
-            return not self.is_threatened(piece, loc)
+            return not self.is_threatened(piece, loc) and not self.is_xrayed(king, loc)
+
+        if len(self.pinned_or_checked[king]) != 1:
+            return False
 
         attacker = self.pinned_or_checked[king][0]
         if loc == attacker.loc:
             return True
 
+        if (
+            piece.type == Type.PAWN
+            and attacker is self.ep_candidate
+            and piece.loc.rank == attacker.loc.rank
+            and loc.file == attacker.loc.file
+            and abs(loc.rank - attacker.loc.rank) == 1
+        ):
+            # Capturing the checking pawn en passant.
+            return True
+
         if not attacker.is_sliding:
             # Only way to escape from a check with non sliding piece is to either move the king or capture the attacker
             return False
@@ -138,6 +438,16 @@ class Engine:
 
         return 0 < t < 1
 
+    def is_xrayed(self, king: Piece, loc: Square) -> bool:
+        # A sliding checker also covers the squares behind the king on its line.
+        for attacker in self.pinned_or_checked[king]:
+            if not attacker.is_sliding or loc == attacker.loc:
+                continue
+            check_dir = attacker.is_in_dir(king.loc)
+            if check_dir is not None and attacker.is_in_dir(loc) == check_dir:
+                return True
+        return False
+
     def does_handle_pin(self, piece: Piece, loc: Square) -> bool:
         if piece.type == Type.KING:
             return True
@@ -173,11 +483,12 @@ class Engine:
         return False
 
     def iterate_between(self, src: Piece, dst: Piece) -> Iterator[Square]:
-        dir = src.is_in_dir(dst.loc)
-        if dir is None:
+        df = dst.loc.file - src.loc.file
+        dr = dst.loc.rank - src.loc.rank
+        if df != 0 and dr != 0 and abs(df) != abs(dr):
             return
 
-        df, dr = dir
+        df, dr = sign(df), sign(dr)
         sq: Square = src.loc
         while (next_sq := sq.move_dir(df, dr)) is not None and next_sq != dst.loc:
             yield next_sq
@@ -185,13 +496,17 @@ class Engine:
 
     def is_pinning(self, piece: Piece) -> Optional[Piece]:
         other_king = self.board.get_king(piece.color.other)
+        if piece.is_in_dir(other_king.loc) is None:
+            return None
+
         pinned: Optional[Piece] = None
         for loc in self.iterate_between(piece, other_king):
-            if self.is_own(other_king, loc):
-                if pinned is None:
-                    pinned = self.board.get_piece(loc)
-                else:
-                    return None
+            target = self.board.get_piece(loc)
+            if target is None:
+                continue
+            if target.color != other_king.color or pinned is not None:
+                return None
+            pinned = target
         return pinned
 
     def update_fboard(self, piece: Piece) -> None:
@@ -205,12 +520,14 @@ class Engine:
         generator = piece.gen_moves()
 
         for loc in generator:
-            if not self.does_blocks_check(piece, loc):
-                continue
-            if not self.does_handle_pin(piece, loc):
-                continue
+            # Pinned pieces, and pieces whose king is in check, still attack
+            # the squares they cannot move to.
             piece.ctrls ^= 1 << loc
-            if self.is_valid_move(piece, loc):
+            if (
+                self.does_blocks_check(piece, loc)
+                and self.does_handle_pin(piece, loc)
+                and self.is_valid_move(piece, loc)
+            ):
                 piece.moves ^= 1 << loc
 
             if piece.is_sliding and not self.board.is_empty(loc):
@@ -227,6 +544,76 @@ class Engine:
                 return None
             self.add_pin(piece, pinned)
 
+    def see(self, from_sq: Square, to_sq: Square) -> int:
+        """Static exchange evaluation of moving the piece on ``from_sq``.
+
+        Material the mover expects to win (negative: lose) if both sides
+        keep recapturing on ``to_sq`` with their least valuable attacker,
+        each side free to stop.  Works off the attacker lists, revealing
+        x-ray attackers as pieces come off, without touching the board.
+        Pins are ignored.
+        """
+        piece = self.board.board[from_sq]
+        if piece is None:
+            raise ValueError(f"No piece on {from_sq}")
+        target = self.board.board[to_sq]
+        if target is not None:
+            gain = [SEE_BY_ID[target.id]]
+        elif piece.id & 14 == Type.PAWN and from_sq >> 3 != to_sq >> 3:
+            gain = [SEE_VALUES[Type.PAWN]]  # en passant
+        else:
+            gain = [0]
+
+        to_file = to_sq >> 3
+        attackers: list[Piece] = []
+        for p in self.fboard.board[to_sq]:
+            # Pawns also "control" the squares they push to.
+            if p.id & 14 != Type.PAWN or abs((p.loc >> 3) - to_file) == 1:
+                attackers.append(p)
+
+        used = {piece}
+        self._add_xrays(piece, to_sq, attackers)
+        value = SEE_BY_ID[piece.id]
+        side = (piece.id & 1) ^ 1
+        while True:
+            best: Optional[Piece] = None
+            best_value = 0
+            for p in attackers:
+                if p.id & 1 == side and p not in used:
+                    v = SEE_BY_ID[p.id]
+                    if best is None or v < best_value:
+                        best, best_value = p, v
+            if best is None:
+                break
+            gain.append(value - gain[-1])
+            if max(-gain[-2], gain[-1]) < 0:
+                # This capture cannot change the outcome.
+                gain.pop()
+                break
+            used.add(best)
+            self._add_xrays(best, to_sq, attackers)
+            value = best_value
+            side ^= 1
+
+        for d in range(len(gain) - 1, 0, -1):
+            gain[d - 1] = -max(-gain[d - 1], gain[d])
+        return gain[0]
+
+    def _add_xrays(self, piece: Piece, to_sq: Square, attackers: list[Piece]) -> None:
+        # Sliders behind ``piece`` that attack to_sq once it leaves the line.
+        loc = piece.loc
+        line = LINE[to_sq]
+        between = BETWEEN[to_sq]
+        for p in self.fboard.board[loc]:
+            kinds = SLIDER_LINES.get(p.id & 14)
+            if (
+                kinds is not None
+                and line[p.loc] in kinds
+                and (between[p.loc] >> loc) & 1
+                and p not in attackers
+            ):
+                attackers.append(p)
+
     def list_moves(self, piece: Piece) -> list[Square]:
         return list(Piece.bb_to_loc(piece.moves))
 
@@ -258,7 +645,39 @@ class Engine:
         self.update_fboard(pinned)
         self.update_fboard(self.board.get_king(piece.color))
 
-    def filter_pins(self) -> None:
+    def discover_pins(self, changed: list[Square]) -> None:
+        # A piece leaving a line can expose a pin the slider was not
+        # recalculated for, since the vacated square was behind its blocker,
+        # and a pin dropped by filter_pins may leave its piece pinned by
+        # another slider that add_pin skipped.  Either pin runs from a king
+        # through a changed square, so only the second piece along that ray
+        # can be the pinner.
+        for color in Color:
+            king = self.board.get_king(color)
+            for sq in changed:
+                if not LINE[king.loc][sq]:
+                    continue
+                df = sign(sq.file - king.loc.file)
+                dr = sign(sq.rank - king.loc.rank)
+                loc: Square = king.loc
+                blockers = 0
+                while (next_loc := loc.move_dir(df, dr)) is not None:
+                    loc = next_loc
+                    piece = self.board.get_piece(loc)
+                    if piece is None:
+                        continue
+                    blockers += 1
+                    if blockers < 2:
+                        continue
+                    if piece.is_sliding and piece.color != color:
+                        pinned = self.is_pinning(piece)
+                        if pinned is not None:
+                            self.add_pin(piece, pinned)
+                    break
+
+    def filter_pins(self) -> list[Square]:
+        """Drop pins that no longer hold; returns the squares of the pieces
+        they were holding."""
         to_be_removed: list[tuple[Piece, Piece]] = []
         for piece, checked_by in self.pinned_or_checked.items():
             if piece.type == Type.KING:
@@ -266,19 +685,32 @@ class Engine:
             if checked_by[0].captured:
                 to_be_removed.append((checked_by[0], piece))
                 continue
-            pinned = self.is_pinning(checked_by[0])
-            if not pinned:
+            if self.is_pinning(checked_by[0]) is not piece:
                 to_be_removed.append((checked_by[0], piece))
         for p1, p2 in to_be_removed:
             self.remove_pin(p1, p2)
+        return [p2.loc for _, p2 in to_be_removed if not p2.captured]
 
-    def handle_pawn_move(self, piece: Piece, loc: Square) -> set[Piece]:
-        self.ep_candidate = None
-        if piece.type != Type.PAWN:
-            return set()
+    def ep_capturers(self, pawn: Piece, loc: Square) -> Iterator[Piece]:
+        for df in (-1, 1):
+            adj = Square.from_coords(loc.file + df, loc.rank)
+            if adj is not None:
+                target = self.board.get_piece(adj)
+                if target is not None and target.id == Type.PAWN | pawn.color.other:
+                    yield target
 
+    def handle_pawn_move(self, piece: Piece, loc: Square) -> set[Piece]:
         recalc_targets: set[Piece] = set()
 
+        if self.ep_candidate is not None:
+            # The en passant right expires with this move.
+            ep = self.ep_candidate
+            recalc_targets.update(self.ep_capturers(ep, ep.loc))
+            self.ep_candidate = None
+
+        if piece.type != Type.PAWN:
+            return recalc_targets
+
         if self.board.is_adj_file(piece.loc, loc) and self.board.is_empty(loc):
             ep_sq = Square.from_coords(loc.file, piece.loc.rank)
             if ep_sq is not None:
@@ -290,12 +722,7 @@ class Engine:
 
         if abs(piece.loc - loc) == 2:
             self.ep_candidate = piece
-            for df in (-1, 1):
-                adj = Square.from_coords(loc.file + df, loc.rank)
-                if adj is not None:
-                    target = self.board.get_piece(adj)
-                    if target is not None and target.id == Type.PAWN | piece.color.other:
-                        recalc_targets.add(target)
+            recalc_targets.update(self.ep_capturers(piece, loc))
 
         return recalc_targets
 
@@ -312,24 +739,49 @@ class Engine:
             if is_checked != self.is_in_check(color):
                 for p in self.board.get_all_pieces(color):
                     self.update_fboard(p)
+                # The other king's escape squares depend on these attacks.
+                self.update_fboard(self.board.get_king(color.other))
 
-    def move_piece(self, piece: Piece, loc: Square) -> None:
-        target = self.board.get_piece(loc)
-
+    def gather_recalc_targets(self, piece: Piece, loc: Square) -> set[Piece]:
+        """Pieces whose moves may change when ``piece`` moves to ``loc``."""
         recalc_targets = {
             piece,
         }
 
+        if self.pinned_or_checked.pop(self.board.get_king(piece.color), None):
+            # Evading a check lifts the restriction on every piece of the mover.
+            recalc_targets.update(self.board.get_all_pieces(piece.color))
+
         recalc_targets.update(self.handle_pawn_move(piece, loc))
         recalc_targets.update(self.handle_castle(piece, loc))
+        if piece.type == Type.KING:
+            # Enemy sliders may pin pieces against the king's new square.
+            recalc_targets.update(
+                p for p in self.board.get_all_pieces(piece.color.other) if p.is_sliding
+            )
         recalc_targets.update(self.fboard.get_pattackers(loc))
         recalc_targets.update(self.fboard.get_pattackers(piece.loc))
+        return recalc_targets
+
+    def move_piece(self, piece: Piece, loc: Square) -> None:
+        target = self.board.get_piece(loc)
+        changed = [piece.loc]
+        if piece.type == Type.PAWN and target is None and piece.loc.file != loc.file:
+            # En passant also empties the captured pawn's square.
+            changed.append(Square((loc.file << 3) | piece.loc.rank))
+        recalc_targets = self.gather_recalc_targets(piece, loc)
 
         if target is not None:
             self.board.capture(target)
             recalc_targets.add(target)
 
+        if piece.type == Type.PAWN or target is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
         self.board.move_piece(piece, loc)
+        self.generation += 1
 
         for p in recalc_targets:
             self.update_fboard(p)
@@ -338,4 +790,117 @@ class Engine:
             self.update_fboard(self.board.get_king(color))
 
         self.handle_checks()
-        self.filter_pins()
+        changed += self.filter_pins()
+        self.discover_pins(changed)
+        self.record_position(piece.color.other)
+
+    def push(self, piece: Piece, loc: Square) -> None:
+        """Make a move that can be taken back with :meth:`pop`."""
+        self.undo_stack.append(self._snapshot())
+        self.move_piece(piece, loc)
+
+    def try_push(self, piece: Piece, loc: Square) -> bool:
+        """:meth:`push` a move from :meth:`gen_pseudo_moves` if it is legal;
+        returns whether it was made."""
+        self.push(piece, loc)
+        return True
+
+    def rewind(self) -> None:
+        """Take back every move made with :meth:`push`, in place.
+
+        Restores the first snapshot directly, so an engine can be reused
+        for a new game without recomputing attacks.
+        """
+        if not self.undo_stack:
+            return
+        self._restore(self.undo_stack[0])
+        # Every push recorded exactly one position.
+        for key in self.key_history[-len(self.undo_stack) :]:
+            self.key_counts[key] -= 1
+            if not self.key_counts[key]:
+                del self.key_counts[key]
+        del self.key_history[-len(self.undo_stack) :]
+        self.undo_stack.clear()
+
+    def push_null(self, color: Color) -> None:
+        """Pass ``color``'s turn, for null-move pruning; undone by :meth:`pop`."""
+        self.undo_stack.append(self._snapshot())
+        self.generation += 1
+        if self.ep_candidate is not None:
+            ep = self.ep_candidate
+            self.ep_candidate = None
+            for p in self.ep_capturers(ep, ep.loc):
+                self.update_fboard(p)
+        self.record_position(color.other)
+
+    def pop(self) -> None:
+        self._restore(self.undo_stack.pop())
+        key = self.key_history.pop()
+        self.key_counts[key] -= 1
+        if not self.key_counts[key]:
+            del self.key_counts[key]
+
+    def _snapshot(self) -> tuple[Any, ...]:
+        pieces = [
+            (p, p.loc, p.moves, p.ctrls, p.has_moved)
+            for plist in self.board.pieces
+            for p in plist
+        ]
+        return (
+            list(self.board.board),
+            [list(plist) for plist in self.board.pieces],
+            self.board.hash,
+            self.board.pawn_hash,
+            [list(attackers) for attackers in self.fboard.board],
+            dict(self.pinned_or_checked),
+            self.ep_candidate,
+            self.halfmove_clock,
+            pieces,
+        )
+
+    def _restore(self, snapshot: tuple[Any, ...]) -> None:
+        (
+            self.board.board,
+            self.board.pieces,
+            self.board.hash,
+            self.board.pawn_hash,
+            self.fboard.board,
+            self.pinned_or_checked,
+            self.ep_candidate,
+            self.halfmove_clock,
+            pieces,
+        ) = snapshot
+        self.generation += 1
+        for p, loc, moves, ctrls, has_moved in pieces:
+            p.loc = loc
+            p.moves = moves
+            p.ctrls = ctrls
+            p.captured = False
+            p.has_moved = has_moved
+
+
+def _distance(a: Square, b: Square) -> int:
+    return max(abs(a.file - b.file), abs(a.rank - b.rank))
+
+
+BACKENDS = ("legal", "pseudo")
+
+
+def create_engine(
+    backend: str = "legal",
+    fen: Optional[str] = None,
+    bitbases: Optional[Bitbases] = None,
+) -> Engine:
+    """An engine using the named move generation backend.
+
+    ``legal`` keeps every piece's legal moves up to date after each move;
+    ``pseudo`` generates moves on demand and checks legality only when a
+    move is made.
+    """
+    if backend == "legal":
+        return Engine(fen, bitbases)
+    if backend == "pseudo":
+        from .pseudo import PseudoEngine
+
+        return PseudoEngine(fen, bitbases)
+    raise ValueError(f"Unknown backend: {backend}")
@@ -0,0 +1,242 @@
+from .engine import Engine
+from .piece import Color, Type
+from .tables import KING_MASK
+
+PIECE_VALUES: dict[Type, int] = {
+    Type.PAWN: 100,
+    Type.KNIGHT: 320,
+    Type.BISHOP: 330,
+    Type.ROOK: 500,
+    Type.QUEEN: 900,
+    Type.KING: 0,
+}
+
+
+def material(engine: Engine, color: Color) -> int:
+    board = engine.board
+    return sum(
+        PIECE_VALUES[t] * (len(board.pieces[t | color]) - len(board.pieces[t | color.other]))
+        for t in Type
+    )
+
+
+# Centipawns per legal move, per attacked square next to the enemy king, and
+# per undefended piece under attack.  All three read the ctrls/moves masks
+# and attacker lists the engine already maintains.
+MOBILITY_WEIGHTS: dict[Type, int] = {
+    Type.KNIGHT: 4,
+    Type.BISHOP: 4,
+    Type.ROOK: 2,
+    Type.QUEEN: 1,
+}
+KING_ZONE_WEIGHTS: dict[Type, int] = {
+    Type.KNIGHT: 6,
+    Type.BISHOP: 6,
+    Type.ROOK: 8,
+    Type.QUEEN: 12,
+}
+HANGING_PENALTY = 20
+
+
+def mobility(engine: Engine, color: Color) -> int:
+    pieces = engine.board.pieces
+    score = 0
+    for t, weight in MOBILITY_WEIGHTS.items():
+        for p in pieces[t | color]:
+            score += weight * p.moves.bit_count()
+        for p in pieces[t | color.other]:
+            score -= weight * p.moves.bit_count()
+    return score
+
+
+def king_zone_attacks(engine: Engine, color: Color) -> int:
+    """Pressure on the squares around the king of ``color``'s opponent."""
+    pieces = engine.board.pieces
+    score = 0
+    for side, sign in ((color, 1), (color.other, -1)):
+        king = engine.board.get_king(side.other).loc
+        zone = KING_MASK[king] | 1 << king
+        for t, weight in KING_ZONE_WEIGHTS.items():
+            for p in pieces[t | side]:
+                score += sign * weight * (p.ctrls & zone).bit_count()
+    return score
+
+
+def hanging(engine: Engine, color: Color) -> int:
+    """Penalty for pieces attacked by the opponent and not defended."""
+    score = 0
+    board = engine.fboard.board
+    for side, sign in ((color, -1), (color.other, 1)):
+        for t in (Type.KNIGHT, Type.BISHOP, Type.ROOK, Type.QUEEN):
+            for p in engine.board.pieces[t | side]:
+                attacked = defended = False
+                for a in board[p.loc]:
+                    # Pawns only attack diagonally.
+                    if a.id & 14 == Type.PAWN and a.loc >> 3 == p.loc >> 3:
+                        continue
+                    if a.id & 1 == side:
+                        defended = True
+                        break
+                    attacked = True
+                if attacked and not defended:
+                    score += sign * HANGING_PENALTY
+    return score
+
+
+# Pawn structure terms, in centipawns.  Passed pawns earn more the further
+# they have advanced (indexed by rank counted from their own side).
+DOUBLED_PENALTY = 12
+ISOLATED_PENALTY = 15
+BACKWARD_PENALTY = 10
+PASSED_BONUS = [0, 5, 10, 20, 35, 60, 100, 0]
+
+# Squares are numbered file-major, so a file is one byte of a bitboard.
+FILE_MASKS = [0xFF << (8 * f) for f in range(8)]
+ADJACENT_FILES = [
+    (FILE_MASKS[f - 1] if f > 0 else 0) | (FILE_MASKS[f + 1] if f < 7 else 0)
+    for f in range(8)
+]
+
+
+def _pawn_masks(color: Color) -> tuple[list[int], list[int], list[int]]:
+    """Per square: the squares ahead on the same and adjacent files, own
+    pawn squares that can support it (adjacent files, not ahead), and the
+    enemy pawn squares that attack its stop square."""
+    step = 1 if color == Color.WHITE else -1
+    passed, support, stop_attackers = [], [], []
+    for sq in range(64):
+        file, rank = sq >> 3, sq & 7
+        ahead = behind = 0
+        for r in range(8):
+            if (r - rank) * step > 0:
+                ahead |= 0x0101010101010101 << r
+            else:
+                behind |= 0x0101010101010101 << r
+        passed.append(ahead & (FILE_MASKS[file] | ADJACENT_FILES[file]))
+        support.append(behind & ADJACENT_FILES[file])
+        stop = rank + 2 * step
+        stop_attackers.append(
+            ADJACENT_FILES[file] & (1 << stop) * 0x0101010101010101
+            if 0 <= stop < 8
+            else 0
+        )
+    return passed, support, stop_attackers
+
+
+PAWN_MASKS = [_pawn_masks(color) for color in Color]
+
+
+def pawn_structure(white: int, black: int) -> int:
+    """Doubled, isolated, backward and passed pawn terms for the pawn
+    bitboards ``white`` and ``black``, from White's point of view."""
+    score = 0
+    for color, own, enemy, sign in (
+        (Color.WHITE, white, black, 1),
+        (Color.BLACK, black, white, -1),
+    ):
+        passed, support, stop_attackers = PAWN_MASKS[color]
+        for f in range(8):
+            count = (own & FILE_MASKS[f]).bit_count()
+            if count > 1:
+                score -= sign * DOUBLED_PENALTY * (count - 1)
+        pawns = own
+        while pawns:
+            sq = (pawns & -pawns).bit_length() - 1
+            pawns &= pawns - 1
+            if not own & ADJACENT_FILES[sq >> 3]:
+                score -= sign * ISOLATED_PENALTY
+            elif not own & support[sq] and enemy & stop_attackers[sq]:
+                score -= sign * BACKWARD_PENALTY
+            if not enemy & passed[sq]:
+                rank = sq & 7 if color == Color.WHITE else 7 - (sq & 7)
+                score += sign * PASSED_BONUS[rank]
+    return score
+
+
+class PawnCache:
+    """Bounded pawn structure scores keyed by :attr:`Board.pawn_hash`.
+
+    Pawns rarely move between neighbouring search nodes, so most lookups
+    hit.  Like the transposition table, the oldest entry is evicted first.
+    """
+
+    def __init__(self, size: int = 1 << 14) -> None:
+        self.size = size
+        self.table: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def score(self, engine: Engine) -> int:
+        """Pawn structure score from White's point of view."""
+        board = engine.board
+        key = board.pawn_hash
+        score = self.table.get(key)
+        if score is not None:
+            self.hits += 1
+            return score
+        self.misses += 1
+        white = black = 0
+        for p in board.pieces[Type.PAWN | Color.WHITE]:
+            white |= 1 << p.loc
+        for p in board.pieces[Type.PAWN | Color.BLACK]:
+            black |= 1 << p.loc
+        score = pawn_structure(white, black)
+        if len(self.table) >= self.size:
+            del self.table[next(iter(self.table))]
+        self.table[key] = score
+        return score
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "entries": len(self.table),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self) -> None:
+        self.table.clear()
+        self.hits = self.misses = 0
+
+
+# Shared by every evaluate() call; pawn scores do not depend on the search.
+pawn_cache = PawnCache()
+
+
+def pawns(engine: Engine, color: Color) -> int:
+    score = pawn_cache.score(engine)
+    return score if color == Color.WHITE else -score
+
+
+def evaluate(engine: Engine, color: Color) -> int:
+    """Static score in centipawns from ``color``'s point of view."""
+    engine.refresh_attacks()
+    return (
+        material(engine, color)
+        + pawns(engine, color)
+        + mobility(engine, color)
+        + king_zone_attacks(engine, color)
+        + hanging(engine, color)
+    )
+
+
+def mop_up(engine: Engine, winner: Color) -> int:
+    """Progress bonus for a side that is known to be winning.
+
+    Drives the losing king to the edge, brings the kings together and
+    pushes passed pawns, so a won ending is converted instead of shuffled.
+    """
+    board = engine.board
+    wk = board.get_king(winner).loc
+    lk = board.get_king(winner.other).loc
+    edge = max(3 - lk.file, lk.file - 4) + max(3 - lk.rank, lk.rank - 4)
+    distance = abs(wk.file - lk.file) + abs(wk.rank - lk.rank)
+    score = 10 * edge + 4 * (14 - distance)
+    for pawn in board.pieces[Type.PAWN | winner]:
+        score += 20 * (pawn.loc.rank if winner == Color.WHITE else 7 - pawn.loc.rank)
+    return score
@@ -0,0 +1,249 @@
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, Optional
+
+from .engine import Engine, Move
+from .pgn import PgnGame, read_pgn, san_to_move
+from .piece import Color, side_to_move
+from .square import Square
+
+MAGIC = b"CEXP"
+# 2: positions key the en passant file only when the capture is legal.
+VERSION = 2
+HEADER = struct.Struct("<4sBxxxQ")
+# Position key, move (from << 6 | to), white wins, draws, black wins.
+RECORD = struct.Struct("<QHIII")
+KEY = struct.Struct("<Q")
+# Outcome slot of each PGN result in a record's counts.
+OUTCOMES = {"1-0": 0, "1/2-1/2": 1, "0-1": 2}
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+
+Counts = dict[tuple[int, int], list[int]]
+
+
+@dataclass(frozen=True)
+class ExplorerMove:
+    move: Move
+    white: int
+    draws: int
+    black: int
+
+    @property
+    def games(self) -> int:
+        return self.white + self.draws + self.black
+
+    def score(self, color: Color) -> float:
+        """Points per game for ``color``."""
+        wins = self.white if color == Color.WHITE else self.black
+        return (wins + self.draws / 2) / self.games
+
+    def __str__(self) -> str:
+        return (
+            f"{self.move[0]}{self.move[1]} {self.games} games"
+            f" +{self.white} ={self.draws} -{self.black}"
+        )
+
+
+def pack_move(move: Move) -> int:
+    return move[0] << 6 | move[1]
+
+
+def unpack_move(code: int) -> Move:
+    return Square(code >> 6), Square(code & 63)
+
+
+def game_positions(
+    games: Iterable[PgnGame], max_plies: int = 40
+) -> Iterator[tuple[int, int, int]]:
+    """``(key, move, outcome)`` for the first ``max_plies`` moves of each
+    decided game.  A game stops at its first move the engine cannot play."""
+    engine: Optional[Engine] = None
+    for game in games:
+        outcome = OUTCOMES.get(game.result)
+        if outcome is None:
+            continue
+        fen = game.fen or START_FEN
+        # Consecutive games from one position reuse the engine.
+        if engine is not None and engine.fen == fen:
+            engine.rewind()
+        else:
+            try:
+                engine = Engine(fen)
+            except (ValueError, IndexError, KeyError):
+                engine = None
+                continue
+        color = side_to_move(fen)
+        for san in game.sans[:max_plies]:
+            try:
+                move = san_to_move(engine, color, san)
+            except ValueError:
+                break
+            yield engine.key(color), pack_move(move), outcome
+            piece = engine.get_piece(move[0])
+            assert piece is not None
+            engine.push(piece, move[1])
+            color = color.other
+
+
+def _write_records(f: IO[bytes], records: Iterable[tuple[int, ...]]) -> int:
+    count = 0
+    pack = RECORD.pack
+    for record in records:
+        f.write(pack(*record))
+        count += 1
+    return count
+
+
+def _sorted_records(counts: Counts) -> Iterator[tuple[int, ...]]:
+    for (key, move), (white, draws, black) in sorted(counts.items()):
+        yield key, move, white, draws, black
+
+
+def _merge(runs: list[Iterator[tuple[int, ...]]]) -> Iterator[tuple[int, ...]]:
+    """Sum the counts of equal ``(key, move)`` entries across sorted runs."""
+    current: Optional[list[int]] = None
+    for key, move, white, draws, black in heapq.merge(*runs):
+        if current is not None and current[0] == key and current[1] == move:
+            current[2] += white
+            current[3] += draws
+            current[4] += black
+            continue
+        if current is not None:
+            yield tuple(current)
+        current = [key, move, white, draws, black]
+    if current is not None:
+        yield tuple(current)
+
+
+def build(
+    games: Iterable[PgnGame],
+    path: str,
+    max_plies: int = 40,
+    run_entries: int = 1 << 20,
+) -> int:
+    """Write the index for ``games`` to ``path``; returns its entry count.
+
+    Counts are aggregated in memory until ``run_entries`` distinct entries,
+    then spilled as a sorted run to a temporary file; the runs are merged at
+    the end, so memory stays bounded however many games are indexed.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    counts: Counts = {}
+    runs: list[IO[bytes]] = []
+    try:
+        for key, move, outcome in game_positions(games, max_plies):
+            entry = counts.get((key, move))
+            if entry is None:
+                entry = counts[(key, move)] = [0, 0, 0]
+            entry[outcome] += 1
+            if len(counts) >= run_entries:
+                run = tempfile.TemporaryFile(dir=directory)
+                _write_records(run, _sorted_records(counts))
+                runs.append(run)
+                counts = {}
+
+        sources: list[Iterator[tuple[int, ...]]] = [_sorted_records(counts)]
+        maps: list[mmap.mmap] = []
+        for run in runs:
+            run.flush()
+            maps.append(mmap.mmap(run.fileno(), 0, access=mmap.ACCESS_READ))
+            sources.append(RECORD.iter_unpack(maps[-1]))
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0))
+            total = _write_records(f, _merge(sources) if runs else sources[0])
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, total))
+        for m in maps:
+            m.close()
+        # Readers never see a partially written index.
+        os.replace(tmp, path)
+        return total
+    finally:
+        for run in runs:
+            run.close()
+
+
+class Explorer:
+    """Read-only, memory-mapped view of an index written by :func:`build`.
+
+    Lookups binary-search the sorted records in place; nothing is read into
+    memory beyond the pages touched.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not an explorer index: {path}")
+        if len(self.mm) != HEADER.size + self.count * RECORD.size:
+            raise ValueError(f"Truncated explorer index: {path}")
+
+    def _first(self, key: int) -> int:
+        lo, hi = 0, self.count
+        unpack_from = KEY.unpack_from
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if unpack_from(self.mm, HEADER.size + mid * RECORD.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup_key(self, key: int) -> list[ExplorerMove]:
+        """Moves played from the position with Zobrist ``key``, most
+        played first."""
+        moves: list[ExplorerMove] = []
+        i = self._first(key)
+        while i < self.count:
+            k, code, white, draws, black = RECORD.unpack_from(
+                self.mm, HEADER.size + i * RECORD.size
+            )
+            if k != key:
+                break
+            moves.append(ExplorerMove(unpack_move(code), white, draws, black))
+            i += 1
+        moves.sort(key=lambda m: m.games, reverse=True)
+        return moves
+
+    def lookup(self, engine: Engine, color: Color) -> list[ExplorerMove]:
+        return self.lookup_key(engine.key(color))
+
+    def close(self) -> None:
+        self.mm.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build an opening explorer index from PGN files."
+    )
+    parser.add_argument("index", help="index file to write")
+    parser.add_argument("pgn", nargs="+", help="PGN files, or - for stdin")
+    parser.add_argument("--plies", type=int, default=40, help="moves per game")
+    parser.add_argument("--run", type=int, default=1 << 20, help="entries per run")
+    args = parser.parse_args()
+
+    def games() -> Iterator[PgnGame]:
+        for name in args.pgn:
+            if name == "-":
+                yield from read_pgn(sys.stdin)
+            else:
+                with open(name, errors="replace") as f:
+                    yield from read_pgn(f)
+
+    start = time.perf_counter()
+    total = build(games(), args.index, args.plies, args.run)
+    print(f"{total} entries in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
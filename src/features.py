@@ -0,0 +1,190 @@
+import argparse
+import os
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .archive import Archive
+from .engine import Engine
+from .piece import Color, Type
+from .pseudo import PAWN_ATTACKS
+
+# Plane layout of one position.  Squares keep the engine's order, so
+# ``planes[c].reshape(8, 8)[file, rank]``, from White's point of view.
+OCCUPANCY = 0  # 12 planes: pieces of each id (Type | Color)
+ATTACKS = 12  # 2 planes: number of White, Black pieces attacking the square
+MOVES = 14  # 12 planes: legal move destinations of the pieces of each id
+SIDE = 26  # 1 plane: all ones with Black to move
+NUM_PLANES = 27
+# Pieces per side with an attack bitboard slot; the engine has no
+# promotions, so a side never has more.
+MAX_PIECES = 16
+
+# Squares a pawn of each colour attacks from each square.  A pawn's
+# ``ctrls`` on the legal backend also hold its pushes.
+PAWN_CAPTURES: list[list[int]] = [
+    [sum(1 << t for t in targets) for targets in squares] for squares in PAWN_ATTACKS
+]
+
+# Per position: 24 bitboards (occupancy then moves), the attack bitboards
+# of each side's pieces, and the side to move.
+Row = tuple[list[int], list[list[int]], int]
+
+
+def gather(engine: Engine, color: Color) -> Row:
+    """Bitboards of the position, read straight from the engine's pieces."""
+    engine.refresh_attacks()
+    boards = [0] * 24
+    ctrls: list[list[int]] = [[0] * MAX_PIECES, [0] * MAX_PIECES]
+    counts = [0, 0]
+    for plist in engine.board.pieces:
+        for p in plist:
+            side = p.id & 1
+            if counts[side] == MAX_PIECES:
+                raise ValueError(f"More than {MAX_PIECES} pieces for one side")
+            boards[p.id] |= 1 << p.loc
+            # ``moves`` are legal on both backends once attacks are refreshed.
+            boards[12 + p.id] |= p.moves
+            if p.id & 14 == Type.PAWN:
+                ctrls[side][counts[side]] = PAWN_CAPTURES[side][p.loc]
+            else:
+                ctrls[side][counts[side]] = p.ctrls
+            counts[side] += 1
+    return boards, ctrls, int(color)
+
+
+def fill(rows: list[Row], out: np.ndarray) -> None:
+    """Write the planes of ``rows`` into ``out`` of shape
+    ``(len(rows), NUM_PLANES, 8, 8)``; every square is set by numpy."""
+    n = len(rows)
+    planes = out.reshape(n, NUM_PLANES, 64)
+    boards = np.array([r[0] for r in rows], dtype="<u8")
+    ctrls = np.array([r[1] for r in rows], dtype="<u8")
+    bits = np.unpackbits(boards.view(np.uint8), bitorder="little").reshape(n, 24, 64)
+    planes[:, OCCUPANCY : OCCUPANCY + 12] = bits[:, :12]
+    planes[:, MOVES : MOVES + 12] = bits[:, 12:]
+    attacks = np.unpackbits(ctrls.view(np.uint8), bitorder="little")
+    planes[:, ATTACKS : ATTACKS + 2] = attacks.reshape(n, 2, MAX_PIECES, 64).sum(
+        axis=2, dtype=np.uint8
+    )
+    planes[:, SIDE] = np.array([r[2] for r in rows], dtype=np.uint8)[:, None]
+
+
+def extract(positions: Iterable[tuple[Engine, Color]]) -> np.ndarray:
+    """Planes of a batch of positions, shape ``(n, NUM_PLANES, 8, 8)``."""
+    rows = [gather(engine, color) for engine, color in positions]
+    out = np.empty((len(rows), NUM_PLANES, 8, 8), dtype=np.uint8)
+    fill(rows, out)
+    return out
+
+
+class ShardWriter:
+    """Writes position planes into preallocated, memory-mapped ``.npy``
+    shards of ``shard_size`` positions each.
+
+    Positions are gathered as bitboards when added and converted a batch
+    at a time directly into the mapped shard.  The last shard is cut to
+    the number of positions written when the writer is closed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shard_size: int = 1 << 14,
+        batch_size: int = 1024,
+        prefix: str = "planes",
+    ) -> None:
+        if shard_size < 1 or batch_size < 1:
+            raise ValueError("Shard and batch sizes must be positive")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.paths: list[str] = []
+        self.shard: Optional[np.memmap] = None
+        self.used = 0
+        self.pending: list[Row] = []
+        self.total = 0
+
+    def add(self, engine: Engine, color: Color) -> None:
+        self.pending.append(gather(engine, color))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        rows = self.pending
+        while rows:
+            if self.shard is None or self.used == self.shard_size:
+                self._next_shard()
+            assert self.shard is not None
+            take = min(len(rows), self.shard_size - self.used)
+            fill(rows[:take], self.shard[self.used : self.used + take])
+            self.used += take
+            self.total += take
+            rows = rows[take:]
+        self.pending = []
+
+    def _next_shard(self) -> None:
+        if self.shard is not None:
+            self.shard.flush()
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.paths):05d}.npy")
+        self.shard = np.lib.format.open_memmap(
+            path, "w+", np.uint8, (self.shard_size, NUM_PLANES, 8, 8)
+        )
+        self.paths.append(path)
+        self.used = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self.shard is None:
+            return
+        shard, self.shard = self.shard, None
+        shard.flush()
+        if self.used < self.shard_size:
+            path = self.paths[-1]
+            tmp = f"{path}.{os.getpid()}.tmp"
+            cut = np.lib.format.open_memmap(
+                tmp, "w+", np.uint8, (self.used, NUM_PLANES, 8, 8)
+            )
+            cut[:] = shard[: self.used]
+            cut.flush()
+            del cut, shard
+            os.replace(tmp, path)
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export feature planes of archived games to .npy shards."
+    )
+    parser.add_argument("archive", help="game archive from src.archive")
+    parser.add_argument("output", help="directory for the shards")
+    parser.add_argument("--shard", type=int, default=1 << 14, help="positions/shard")
+    parser.add_argument("--every", type=int, default=1, help="keep every Nth ply")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine: Optional[Engine] = None
+    with Archive(args.archive) as archive, ShardWriter(
+        args.output, args.shard
+    ) as writer:
+        for i in range(len(archive)):
+            for ply, (engine, color, _) in enumerate(archive.replay(i, engine)):
+                if ply % args.every == 0:
+                    writer.add(engine, color)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{writer.total} positions in {len(writer.paths)} shards,"
+        f" {writer.total / elapsed if elapsed else 0:.0f} positions/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,54 @@ from typing import Optional
 
 from .board import Board
 from .display import UI
-from .engine import Engine
+from .engine import Engine, Move
+from .explorer import Explorer
 from .piece import Color, Piece
+from .search import Ponderer, Search, SearchResult
 from .square import Square
 
 
 class Game:
-    def __init__(self, board: Engine, display: UI, turn: Color = Color.WHITE) -> None:
+    def __init__(
+        self,
+        board: Engine,
+        display: UI,
+        turn: Color = Color.WHITE,
+        engine_color: Optional[Color] = None,
+        think_time: float = 1.0,
+        ponder: bool = False,
+        explorer: Optional[Explorer] = None,
+        move_cache: bool = False,
+    ) -> None:
         self.engine = board
+        if move_cache:
+            # Positions are revisited after restarts; their moves are cached.
+            self.engine.enable_move_cache()
         self.display = display
         self.turn = turn
         self.turn_init = turn
+        self.engine_color = engine_color
+        self.think_time = think_time
+        self.search = Search()
+        self.ponderer = Ponderer(self.search, think_time) if ponder else None
+        self.explorer = explorer
+        self.last_move: Optional[Move] = None
+        self.moves: list[Square] = []
+        self.cur_selected: Optional[Piece] = None
+        self.is_over = False
+        self.thinking = False
 
     def restart(self) -> None:
+        if self.ponderer is not None:
+            self.ponderer.cancel()
         self.engine.reset()
         self.turn = self.turn_init
+        self.last_move = None
+        self.is_over = False
 
     @property
     def is_end(self) -> bool:
-        return self.engine.nmoves(self.turn) == 0
+        return self.engine.status(self.turn).is_over
 
     def notation_to_loc(self, notation: str) -> Square:
         return Square.from_notation(notation)
@@ -28,30 +57,10 @@ class Game:
     def index_to_notation(self, loc: Square) -> str:
         return str(loc)
 
-    def get_file_and_rank(self) -> int:
-        while True:
-            loc = self.display.get_input("Enter position (e.g., e2): ").lower()
-            if len(loc) == 2 and loc[0] in "abcdefgh" and loc[1] in "12345678":
-                return self.notation_to_loc(loc)
-            elif loc == "exit":
-                return -1
-            elif loc == "restart":
-                return -2
-            self.display.show_err(
-                "Invalid input. Please enter a valid position like 'e2'."
-            )
-
-    def is_restart(self) -> bool:
-        while True:
-            cmd = self.display.get_input("Exit or Restart:").lower()
-            if cmd == "exit":
-                return False
-            elif cmd == "restart":
-                self.restart()
-                return True
-            else:
-                self.display.show_err("Invalid input. Enter exit or restart")
-                continue
+    def is_valid_position(self, notation: str) -> bool:
+        return (
+            len(notation) == 2 and notation[0] in "abcdefgh" and notation[1] in "12345678"
+        )
 
     def list_moves(self, loc: Square) -> list[Square]:
         piece = self.engine.get_piece(loc)
@@ -63,11 +72,7 @@ class Game:
             self.display.show_err("It's not this piece's turn to move.")
             return []
 
-        moves = self.engine.list_moves(piece)
-        if len(moves) == 0:
-            return []
-
-        return moves
+        return [dst for src, dst in self.engine.legal_moves(self.turn) if src == loc]
 
     def get_board(self) -> Board:
         return self.engine.board
@@ -75,50 +80,151 @@ class Game:
     def get_turn(self) -> Color:
         return self.turn
 
+    def book_move(self) -> Optional[Move]:
+        """The most played move here in the explorer index, if any."""
+        if self.explorer is None:
+            return None
+        moves = self.explorer.lookup(self.engine, self.turn)
+        legal = set(self.engine.legal_moves(self.turn))
+        return next((m.move for m in moves if m.move in legal), None)
+
+    def show_book(self) -> None:
+        if self.explorer is None:
+            self.display.show_err("No explorer index loaded.")
+            return
+        moves = self.explorer.lookup(self.engine, self.turn)
+        if not moves:
+            self.display.show_err("Position not in the explorer index.")
+            return
+        self.display.show_err(" | ".join(str(m) for m in moves[:5]))
+
+    def choose_engine_move(self) -> SearchResult:
+        """The engine's move here; may run off the input loop's thread."""
+        book = self.book_move()
+        if book is not None:
+            if self.ponderer is not None:
+                self.ponderer.cancel()
+            return SearchResult(book, pv=[book])
+        result = None
+        if self.ponderer is not None and self.last_move is not None:
+            result = self.ponderer.resolve(self.last_move)
+        if result is None or result.move is None:
+            result = self.search.think(
+                self.engine, self.turn, time_limit=self.think_time
+            )
+        return result
+
+    def play_engine_move(self, result: SearchResult) -> None:
+        assert result.move is not None
+        src, dst = result.move
+        piece = self.engine.get_piece(src)
+        assert piece is not None
+        self.engine.move_piece(piece, dst)
+        self.last_move = result.move
+        self.turn = self.turn.other
+
+        if self.ponderer is not None and len(result.pv) > 1:
+            self.ponderer.start(self.engine, self.turn.other, result.pv[1])
+
+    @property
+    def prompt(self) -> str:
+        if self.is_over:
+            return "Exit or Restart:"
+        return "Enter position (e.g., e2): "
+
     def run(self) -> None:
+        try:
+            self.display.show_board(self.engine.get_board(), self.turn)
+            self.advance()
+            self.display.run(self.on_input, lambda: self.prompt)
+        finally:
+            # Closing the window may leave an engine move being searched.
+            self.search.stop.set()
+            if self.ponderer is not None:
+                self.ponderer.cancel()
+
+    def advance(self) -> None:
+        if self.thinking:
+            return
+        if not self.is_end and self.turn == self.engine_color:
+            # The search runs in the display's background so the window
+            # stays responsive; input is refused until the move is played.
+            self.thinking = True
+            self.display.background(self.choose_engine_move, self._engine_moved)
+            return
+
+        if not self.is_end:
+            return
+
+        result = self.engine.status(self.turn).result
+        assert result is not None
+        end_message: list[str] = ["Game over!", f"{result.capitalize()}!"]
+        if result == "checkmate":
+            end_message.append(f"{'White' if self.turn else 'Black'} wins!")
+        else:
+            end_message.append("It's a draw!")
         self.display.show_board(self.engine.get_board(), self.turn)
-        moves: list[Square] = []
-        cur_selected: Optional[Piece] = None
-
-        while True:
-            if self.is_end:
-                end_message: list[str] = ["Game over!"]
-                if self.engine.is_in_check(self.turn):
-                    end_message.append("Checkmate!")
-                    end_message.append(f"{'White' if self.turn else 'Black'} wins!")
-                else:
-                    end_message.append("Stalemate!")
-                    end_message.append("It's a draw!")
+        self.display.show_end_result("\n".join(end_message))
+        self.moves = []
+        self.cur_selected = None
+        self.is_over = True
+
+    def _engine_moved(self, result: SearchResult) -> None:
+        self.thinking = False
+        self.play_engine_move(result)
+        self.display.show_board(self.engine.get_board(), self.turn)
+        self.advance()
+
+    def on_input(self, value: str) -> bool:
+        """Handle one input from the display; returns False to quit."""
+        value = value.lower()
+        if self.thinking:
+            if value == "exit":
+                return False
+            self.display.show_err("The engine is thinking.")
+            return True
+        if self.is_over:
+            if value == "exit":
+                return False
+            if value == "restart":
+                self.restart()
                 self.display.show_board(self.engine.get_board(), self.turn)
-                self.display.show_end_result("\n".join(end_message))
-                moves = []
-                cur_selected = None
-                if self.is_restart():
-                    self.display.show_board(self.engine.get_board(), self.turn)
-                else:
-                    break
-
-            raw = self.get_file_and_rank()
-            if raw == -1:
-                break
-            elif raw < -1:
-                moves = []
-                cur_selected = None
-                self.display.show_err("Enter valid command.")
-                continue
-
-            loc = Square(raw)
-            if len(moves) == 0:
-                moves = self.list_moves(loc)
-                if len(moves) > 0:
-                    cur_selected = self.engine.get_piece(loc)
-                    assert cur_selected is not None
+                self.advance()
             else:
-                if loc in moves:
-                    assert cur_selected is not None
-                    self.engine.move_piece(cur_selected, loc)
-                    self.turn = self.turn.other
-                cur_selected = None
-                moves = []
-
-            self.display.show_board(self.engine.get_board(), self.turn, moves)
+                self.display.show_err("Invalid input. Enter exit or restart")
+            return True
+
+        if value == "exit":
+            return False
+        if value == "restart":
+            self.moves = []
+            self.cur_selected = None
+            self.display.show_err("Enter valid command.")
+            return True
+        if value == "book":
+            self.show_book()
+            return True
+        if not self.is_valid_position(value):
+            self.display.show_err(
+                "Invalid input. Please enter a valid position like 'e2'."
+            )
+            return True
+
+        loc = self.notation_to_loc(value)
+        if len(self.moves) == 0:
+            self.moves = self.list_moves(loc)
+            if len(self.moves) > 0:
+                self.cur_selected = self.engine.get_piece(loc)
+                assert self.cur_selected is not None
+        else:
+            if loc in self.moves:
+                assert self.cur_selected is not None
+                self.last_move = (self.cur_selected.loc, loc)
+                self.engine.move_piece(self.cur_selected, loc)
+                self.turn = self.turn.other
+            self.cur_selected = None
+            self.moves = []
+
+        self.display.show_board(self.engine.get_board(), self.turn, self.moves)
+        self.advance()
+        return True
@@ -0,0 +1,332 @@
+import argparse
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .analysis import iter_positions
+from .bitbase import Bitbases
+from .engine import Engine, Move
+from .pgn import move_to_san, write_pgn
+from .piece import Color, side_to_move
+from .search import Search
+
+# Balanced positions a few moves into common openings.
+OPENINGS: list[str] = [
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b - - 0 1",
+    "rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b - - 0 1",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w - - 0 2",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w - - 0 2",
+    "rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w - - 0 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w - - 0 2",
+    "rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w - - 1 2",
+    "rnbqkbnr/pppppppp/8/8/2P5/8/PP1PPPPP/RNBQKBNR b - - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w - - 2 3",
+    "rnbqkbnr/pp2pppp/2p5/3p4/3PP3/8/PPP2PPP/RNBQKBNR w - - 0 3",
+    "rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/8/PPP2PPP/RNBQKBNR w - - 0 3",
+    "rnbqkb1r/pppp1ppp/5n2/4p3/2P5/2N5/PP1PPPPP/R1BQKBNR w - - 2 3",
+]
+
+# Bitbases opened in this process, by directory.  Worker processes play
+# many games, so each opens the files once rather than per game.
+_bitbases: dict[str, Bitbases] = {}
+
+
+def open_bitbases(directory: str) -> Bitbases:
+    bitbases = _bitbases.get(directory)
+    if bitbases is None:
+        bitbases = _bitbases[directory] = Bitbases(directory)
+    return bitbases
+
+
+@dataclass
+class EngineConfig:
+    name: str
+    think_time: Optional[float] = None
+    max_depth: int = 3
+    tt_size: int = 1 << 16
+    bitbase_dir: Optional[str] = None
+    null_move: bool = True
+    lmr: bool = True
+    aspiration: bool = True
+
+
+@dataclass
+class GameRecord:
+    white: str
+    black: str
+    fen: str
+    result: str
+    sans: list[str] = field(default_factory=list)
+    reason: str = ""
+    moves: list[Move] = field(default_factory=list)
+
+    @property
+    def pgn(self) -> str:
+        headers = {"White": self.white, "Black": self.black}
+        if self.reason:
+            headers["Termination"] = self.reason
+        return write_pgn(self.sans, self.result, headers, self.fen)
+
+
+@dataclass
+class SPRT:
+    """Sequential probability ratio test between two Elo hypotheses.
+
+    Uses the generalised SPRT approximation on the game score, so the test
+    can stop as soon as the candidate is clearly at least ``elo1`` better
+    (accept) or no better than ``elo0`` (reject).
+    """
+
+    elo0: float = 0.0
+    elo1: float = 10.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    @property
+    def bounds(self) -> tuple[float, float]:
+        return (
+            math.log(self.beta / (1 - self.alpha)),
+            math.log((1 - self.beta) / self.alpha),
+        )
+
+    def llr(self, wins: int, draws: int, losses: int) -> float:
+        n = wins + draws + losses
+        if n == 0 or wins + losses == 0:
+            return 0.0
+        score = (wins + draws / 2) / n
+        var = (
+            wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score**2
+        ) / n
+        if var <= 0:
+            return 0.0
+        s0 = 1 / (1 + 10 ** (-self.elo0 / 400))
+        s1 = 1 / (1 + 10 ** (-self.elo1 / 400))
+        return n * (s1 - s0) * (2 * score - s0 - s1) / (2 * var)
+
+    def decide(self, wins: int, draws: int, losses: int) -> Optional[str]:
+        lower, upper = self.bounds
+        llr = self.llr(wins, draws, losses)
+        if llr >= upper:
+            return "H1"
+        if llr <= lower:
+            return "H0"
+        return None
+
+
+@dataclass
+class MatchResult:
+    candidate: str
+    baseline: str
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    # Games stopped at the ply limit, left out of the score and the SPRT.
+    unfinished: int = 0
+    games: list[GameRecord] = field(default_factory=list)
+    elapsed: float = 0.0
+    decision: Optional[str] = None
+    llr: float = 0.0
+
+    @property
+    def played(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def games_per_second(self) -> float:
+        return len(self.games) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def elo(self) -> float:
+        if self.played == 0:
+            return 0.0
+        score = (self.wins + self.draws / 2) / self.played
+        score = min(max(score, 1e-3), 1 - 1e-3)
+        return -400 * math.log10(1 / score - 1)
+
+    def add(self, record: GameRecord) -> None:
+        self.games.append(record)
+        if record.result == "*":
+            self.unfinished += 1
+        elif record.result == "1/2-1/2":
+            self.draws += 1
+        elif (record.result == "1-0") == (record.white == self.candidate):
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    @property
+    def pgn(self) -> str:
+        return "\n".join(g.pgn for g in self.games)
+
+
+def play_game(
+    white: EngineConfig, black: EngineConfig, fen: str, max_plies: int = 200
+) -> GameRecord:
+    """Play one headless game between two engine configurations."""
+    engine = Engine(fen)
+    configs = {Color.WHITE: white, Color.BLACK: black}
+    searches = {
+        c: Search(cfg.tt_size, cfg.null_move, cfg.lmr, cfg.aspiration)
+        for c, cfg in configs.items()
+    }
+    # Each side searches with its own bitbases (or none), so a match can
+    # measure what they are worth.
+    bitbases = {
+        c: open_bitbases(cfg.bitbase_dir) if cfg.bitbase_dir else None
+        for c, cfg in configs.items()
+    }
+    # A game cut off at ``max_plies`` stays unresolved ("*").
+    record = GameRecord(white.name, black.name, fen, "*")
+
+    turn = side_to_move(fen)
+    for _ in range(max_plies):
+        status = engine.status(turn)
+        if status.result is not None:
+            if status.result == "checkmate":
+                record.result = "0-1" if turn == Color.WHITE else "1-0"
+            else:
+                record.result = "1/2-1/2"
+            record.reason = status.result
+            return record
+
+        cfg = configs[turn]
+        engine.bitbases = bitbases[turn]
+        result = searches[turn].think(
+            engine, turn, max_depth=cfg.max_depth, time_limit=cfg.think_time
+        )
+        assert result.move is not None
+        record.sans.append(move_to_san(engine, result.move))
+        record.moves.append(result.move)
+        src, dst = result.move
+        piece = engine.get_piece(src)
+        assert piece is not None
+        engine.move_piece(piece, dst)
+        turn = turn.other
+
+    record.reason = "max plies"
+    return record
+
+
+def run_match(
+    candidate: EngineConfig,
+    baseline: EngineConfig,
+    openings: Optional[list[str]] = None,
+    games: int = 100,
+    workers: Optional[int] = None,
+    sprt: Optional[SPRT] = None,
+    max_plies: int = 200,
+) -> MatchResult:
+    """Play ``candidate`` against ``baseline`` over an opening suite.
+
+    Every opening is played twice with colours reversed.  Games run in a
+    process pool; with an ``sprt`` the match stops as soon as the test
+    reaches a decision.
+    """
+    openings = openings or OPENINGS
+    match = MatchResult(candidate.name, baseline.name)
+    pairings: list[tuple[EngineConfig, EngineConfig, str]] = []
+    for i in range(games):
+        fen = openings[(i // 2) % len(openings)]
+        if i % 2 == 0:
+            pairings.append((candidate, baseline, fen))
+        else:
+            pairings.append((baseline, candidate, fen))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set[Future[GameRecord]] = {
+            pool.submit(play_game, white, black, fen, max_plies)
+            for white, black, fen in pairings
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                match.add(future.result())
+            if sprt is not None:
+                match.llr = sprt.llr(match.wins, match.draws, match.losses)
+                match.decision = sprt.decide(match.wins, match.draws, match.losses)
+                if match.decision is not None:
+                    for future in pending:
+                        future.cancel()
+                    break
+    match.elapsed = time.perf_counter() - start
+    return match
+
+
+def load_openings(path: str) -> list[str]:
+    """Read one FEN or EPD position per line, skipping blanks and comments."""
+    with open(path) as f:
+        return list(iter_positions(f))
+
+
+def parse_config(name: str, spec: str) -> EngineConfig:
+    """Parse ``key=value`` pairs such as ``depth=3,time=0.5,lmr=0``."""
+    config = EngineConfig(name)
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key == "depth":
+            config.max_depth = int(value)
+        elif key == "time":
+            config.think_time = float(value)
+        elif key == "tt":
+            config.tt_size = int(value)
+        elif key == "bitbases":
+            config.bitbase_dir = value
+        elif key == "nmp":
+            config.null_move = value != "0"
+        elif key == "lmr":
+            config.lmr = value != "0"
+        elif key == "asp":
+            config.aspiration = value != "0"
+        else:
+            raise ValueError(f"Unknown engine option: {key}")
+    return config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a headless engine match.")
+    parser.add_argument("--candidate", default="", help="e.g. depth=3,time=0.5")
+    parser.add_argument("--baseline", default="")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--openings", help="file with one FEN/EPD per line")
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--pgn", help="write all games to this file")
+    parser.add_argument("--archive", help="write all games to this game archive")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"))
+    args = parser.parse_args()
+
+    candidate = parse_config("candidate", args.candidate)
+    baseline = parse_config("baseline", args.baseline)
+    openings = load_openings(args.openings) if args.openings else None
+    sprt = SPRT(*args.sprt) if args.sprt else None
+
+    match = run_match(
+        candidate, baseline, openings, args.games, args.workers, sprt, args.max_plies
+    )
+    if args.pgn:
+        with open(args.pgn, "w") as f:
+            f.write(match.pgn)
+    if args.archive:
+        # Imported here: the archive module builds on this one.
+        from .archive import ArchiveWriter
+
+        with ArchiveWriter(args.archive) as writer:
+            for game in match.games:
+                tags = {"White": game.white, "Black": game.black}
+                writer.add(game.moves, game.result, game.fen, tags)
+
+    print(
+        f"+{match.wins} ={match.draws} -{match.losses} ({match.played} games,"
+        f" {match.unfinished} unfinished)"
+    )
+    print(f"Elo {match.elo:+.1f}, {match.games_per_second:.2f} games/s")
+    if sprt is not None:
+        lower, upper = sprt.bounds
+        print(f"LLR {match.llr:.2f} [{lower:.2f}, {upper:.2f}] {match.decision or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from .analysis import iter_positions
+from .engine import BACKENDS, Engine, Move, create_engine
+from .piece import Color, side_to_move
+
+# Proof or disproof number of a solved node.
+INF = 1 << 30
+MAX_MOVES = 32
+# Starting proof number of a quiet attacking move, against the number of
+# replies for a check.
+QUIET_PN = 8
+
+_rng = random.Random(0x3A7E)
+# Mixed into position keys: the same position asks a different question
+# at each remaining depth and for either side to be the attacker.
+DEPTH_KEYS: list[list[int]] = [
+    [_rng.getrandbits(64) for _ in range(MAX_MOVES + 1)] for _ in range(2)
+]
+_DM = re.compile(r"\bdm\s+(\d+)")
+
+
+class NodeTable:
+    """Proof and disproof numbers in three flat arrays.
+
+    Direct-mapped on the low bits of the key and always replacing, so memory
+    is fixed at 16 bytes a slot however large the proof tree grows.
+    """
+
+    def __init__(self, size: int = 1 << 18) -> None:
+        if size < 1 or size & (size - 1):
+            raise ValueError(f"Table size must be a power of two, not {size}")
+        self.mask = size - 1
+        self.keys = array("Q", bytes(8 * size))
+        self.pn = array("I", bytes(4 * size))
+        self.dn = array("I", bytes(4 * size))
+
+    def get(self, key: int) -> Optional[tuple[int, int]]:
+        i = key & self.mask
+        if self.keys[i] != key or not (self.pn[i] or self.dn[i]):
+            return None
+        return self.pn[i], self.dn[i]
+
+    def put(self, key: int, pn: int, dn: int) -> None:
+        i = key & self.mask
+        self.keys[i] = key
+        self.pn[i] = pn
+        self.dn[i] = dn
+
+    def clear(self) -> None:
+        size = self.mask + 1
+        self.keys = array("Q", bytes(8 * size))
+        self.pn = array("I", bytes(4 * size))
+        self.dn = array("I", bytes(4 * size))
+
+
+@dataclass
+class MateResult:
+    # True: mate in ``moves``; False: no mate within the limit; None: the
+    # node budget ran out first.
+    mate: Optional[bool]
+    moves: Optional[int] = None
+    move: Optional[Move] = None
+    nodes: int = 0
+    seconds: float = 0.0
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+class _Child:
+    __slots__ = ("move", "pn", "dn")
+
+    def __init__(self, move: Move, pn: int, dn: int) -> None:
+        self.move = move
+        self.pn = pn
+        self.dn = dn
+
+
+def _sum(values: Iterable[int]) -> int:
+    total = 0
+    for v in values:
+        if v >= INF:
+            return INF
+        total += v
+    return min(total, INF - 1)
+
+
+class MateSolver:
+    """Depth-first proof-number search for forced mates.
+
+    OR nodes are the attacker to move, AND nodes the defender.  A node is
+    proved (``pn == 0``) when the attacker mates within the remaining
+    moves whatever the defence, disproved (``dn == 0``) when it cannot.
+    A check starts with its number of legal replies as proof number and a
+    quiet move with ``QUIET_PN``, so forcing lines are searched first and
+    most quiet ones never expanded.
+    """
+
+    def __init__(self, table_size: int = 1 << 18, max_nodes: int = 200_000) -> None:
+        self.table = NodeTable(table_size)
+        self.max_nodes = max_nodes
+        self.nodes = 0
+
+    def solve(self, engine: Engine, color: Color, max_moves: int) -> MateResult:
+        """Shortest mate for ``color`` in at most ``max_moves`` moves."""
+        if not 1 <= max_moves <= MAX_MOVES:
+            raise ValueError(f"Mate length must be 1-{MAX_MOVES}, not {max_moves}")
+        start = time.perf_counter()
+        self.nodes = 0
+        root = len(engine.undo_stack)
+        result = MateResult(False)
+        try:
+            for moves in range(1, max_moves + 1):
+                children = self._expand(engine, color, moves, True)
+                pn, _ = self._mid(engine, color, moves, True, INF, INF, children)
+                if pn == 0:
+                    move = next(c.move for c in children if c.pn == 0)
+                    result = MateResult(True, moves, move)
+                    break
+        except _OutOfNodes:
+            while len(engine.undo_stack) > root:
+                engine.pop()
+            result = MateResult(None)
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _expand(
+        self, engine: Engine, color: Color, depth: int, or_node: bool
+    ) -> list[_Child]:
+        moves = engine.legal_moves(color)
+        if not or_node:
+            # Attacker replies are only looked at when descended into.
+            return [_Child(move, 1, 1) for move in moves]
+        # The attacker's moves are made once here so the defender's
+        # replies to a check can be counted and mates found right away.
+        other = color.other
+        children: list[_Child] = []
+        for src, dst in moves:
+            piece = engine.get_piece(src)
+            assert piece is not None
+            engine.push(piece, dst)
+            known = self.table.get(engine.key(other) ^ DEPTH_KEYS[0][depth - 1])
+            if known is not None:
+                pn, dn = known
+            elif engine.in_check(other):
+                replies = engine.nmoves(other)
+                if replies == 0:
+                    pn, dn = 0, INF
+                elif depth == 1:
+                    pn, dn = INF, 0
+                else:
+                    pn, dn = replies, 1
+            elif depth == 1:
+                pn, dn = INF, 0
+            else:
+                pn, dn = QUIET_PN, 1
+            engine.pop()
+            children.append(_Child((src, dst), pn, dn))
+        return children
+
+    def _mid(
+        self,
+        engine: Engine,
+        color: Color,
+        depth: int,
+        or_node: bool,
+        thpn: int,
+        thdn: int,
+        children: Optional[list[_Child]] = None,
+    ) -> tuple[int, int]:
+        key = engine.key(color) ^ DEPTH_KEYS[or_node][depth]
+        known = self.table.get(key)
+        # The root (given its children) is searched through for its move.
+        if known is not None and children is None:
+            if known[0] >= thpn or known[1] >= thdn:
+                return known
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _OutOfNodes
+        if children is None:
+            children = self._expand(engine, color, depth, or_node)
+        if not children:
+            # No legal moves: a defender in check is mated, anything else
+            # (stalemate, or the attacker mated) is no win.
+            if not or_node and engine.in_check(color):
+                pn, dn = 0, INF
+            else:
+                pn, dn = INF, 0
+            self.table.put(key, pn, dn)
+            return pn, dn
+        child_depth = depth - 1 if or_node else depth
+
+        while True:
+            if or_node:
+                pn = min(c.pn for c in children)
+                dn = _sum(c.dn for c in children)
+            else:
+                pn = _sum(c.pn for c in children)
+                dn = min(c.dn for c in children)
+            if pn >= thpn or dn >= thdn:
+                break
+            # Descend into the most proving child, with thresholds that
+            # bring the search back once the runner-up becomes better.
+            best = second = None
+            for c in children:
+                value = c.pn if or_node else c.dn
+                if best is None or value < (best.pn if or_node else best.dn):
+                    best, second = c, best
+                elif second is None or value < (second.pn if or_node else second.dn):
+                    second = c
+            assert best is not None
+            if or_node:
+                runner_up = INF if second is None else second.pn
+                c_thpn = min(thpn, runner_up + 1)
+                c_thdn = min(INF, thdn - dn + best.dn)
+            else:
+                runner_up = INF if second is None else second.dn
+                c_thdn = min(thdn, runner_up + 1)
+                c_thpn = min(INF, thpn - pn + best.pn)
+            piece = engine.get_piece(best.move[0])
+            assert piece is not None
+            engine.push(piece, best.move[1])
+            best.pn, best.dn = self._mid(
+                engine, color.other, child_depth, not or_node, c_thpn, c_thdn
+            )
+            engine.pop()
+
+        self.table.put(key, pn, dn)
+        return pn, dn
+
+
+def parse_puzzle(line: str) -> tuple[str, Optional[int]]:
+    """FEN and the mate length of an EPD ``dm`` operation, if given."""
+    fen = next(iter_positions([line]))
+    match = _DM.search(line)
+    return fen, int(match.group(1)) if match else None
+
+
+def solve_batch(
+    lines: Iterable[str],
+    max_moves: int = 3,
+    solver: Optional[MateSolver] = None,
+    backend: str = "pseudo",
+) -> Iterator[dict[str, Any]]:
+    """Solve FEN/EPD lines; an EPD ``dm`` operation sets the mate length,
+    otherwise ``max_moves`` is used."""
+    solver = solver or MateSolver()
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        fen, moves = parse_puzzle(line)
+        try:
+            engine = create_engine(backend, fen)
+            result = solver.solve(engine, side_to_move(fen), moves or max_moves)
+        except (ValueError, IndexError, KeyError) as e:
+            yield {"fen": fen, "error": str(e) or type(e).__name__}
+            continue
+        report: dict[str, Any] = {
+            "fen": fen,
+            "mate": result.mate,
+            "moves": result.moves,
+            "nodes": result.nodes,
+            "seconds": round(result.seconds, 4),
+        }
+        if result.move is not None:
+            report["move"] = f"{result.move[0]}{result.move[1]}"
+        if moves is not None:
+            report["expected"] = moves
+        yield report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Prove forced mates in FEN/EPD positions (EPD 'dm N' sets N)."
+    )
+    parser.add_argument("input", help="file with one FEN/EPD per line, or -")
+    parser.add_argument("--moves", type=int, default=3, help="default mate length")
+    parser.add_argument("--nodes", type=int, default=200_000, help="budget per puzzle")
+    parser.add_argument("--table", type=int, default=1 << 18, help="node table slots")
+    parser.add_argument("--backend", choices=BACKENDS, default="pseudo")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    solver = MateSolver(args.table, args.nodes)
+    start = time.perf_counter()
+    total = solved = 0
+    try:
+        for report in solve_batch(source, args.moves, solver, args.backend):
+            print(json.dumps(report))
+            total += 1
+            solved += report.get("mate") is True
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{solved}/{total} mates in {elapsed:.2f} s"
+        f" ({total / elapsed if elapsed else 0:.1f} positions/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
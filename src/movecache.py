@@ -0,0 +1,80 @@
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from .square import Square
+
+if TYPE_CHECKING:
+    from .engine import Engine, Move
+    from .piece import Color
+
+# Every move code (from << 6 | to) unpacked once.
+MOVES: list[tuple[Square, Square]] = [
+    (Square(code >> 6), Square(code & 63)) for code in range(4096)
+]
+IN_CHECK = 1
+
+
+class MoveCache:
+    """Legal moves and check flag per position, keyed by Zobrist key.
+
+    Entries are the move list packed as 16-bit ``from << 6 | to`` codes
+    plus a flags byte, so a revisited position (stepping back through a
+    game, analysing overlapping lines) is served without generating moves.
+    The least recently used entry is evicted once ``size`` is reached.
+    """
+
+    def __init__(self, size: int = 1 << 16) -> None:
+        if size < 1:
+            raise ValueError(f"Cache size must be positive, not {size}")
+        self.size = size
+        self.table: OrderedDict[int, tuple[bytes, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def entry(self, engine: "Engine", color: "Color") -> tuple[bytes, int]:
+        key = engine.key(color)
+        entry = self.table.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.table.move_to_end(key)
+            return entry
+        self.misses += 1
+        codes = array("H", [src << 6 | dst for src, dst in engine.gen_moves(color)])
+        entry = codes.tobytes(), IN_CHECK if engine.in_check(color) else 0
+        if len(self.table) >= self.size:
+            self.table.popitem(last=False)
+            self.evictions += 1
+        self.table[key] = entry
+        return entry
+
+    def moves(self, engine: "Engine", color: "Color") -> list["Move"]:
+        packed, _ = self.entry(engine, color)
+        codes = array("H")
+        codes.frombytes(packed)
+        return [MOVES[code] for code in codes]
+
+    def counts(self, engine: "Engine", color: "Color") -> tuple[int, bool]:
+        """Legal move count and whether ``color`` is in check."""
+        packed, flags = self.entry(engine, color)
+        return len(packed) // 2, bool(flags & IN_CHECK)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "entries": len(self.table),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self) -> None:
+        self.table.clear()
+        self.hits = self.misses = self.evictions = 0
+
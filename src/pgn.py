@@ -0,0 +1,179 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from .engine import Engine, Move
+from .piece import Color, Piece, Type, side_to_move
+from .square import Square
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+_TAG = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+# Comments, variations and NAGs are skipped; nested variations are removed
+# innermost first by repeated substitution.
+_COMMENT = re.compile(r"\{[^}]*\}|;[^\n]*")
+_VARIATION = re.compile(r"\([^()]*\)")
+_MOVE_NUMBER = re.compile(r"^\d+\.+")
+
+
+@dataclass
+class PgnGame:
+    headers: dict[str, str] = field(default_factory=dict)
+    sans: list[str] = field(default_factory=list)
+    result: str = "*"
+
+    @property
+    def fen(self) -> Optional[str]:
+        return self.headers.get("FEN")
+
+
+def move_to_san(engine: Engine, move: Move) -> str:
+    """SAN of ``move`` in the current position, before it is played."""
+    src, dst = move
+    piece = engine.get_piece(src)
+    if piece is None:
+        raise ValueError(f"No piece on {src}")
+
+    capture = engine.get_piece(dst) is not None
+    if piece.type == Type.PAWN:
+        capture = src.file != dst.file
+        san = f"{str(src)[0]}x{dst}" if capture else str(dst)
+    else:
+        rivals = [
+            p
+            for p in engine.board.pieces[piece.id]
+            if p is not piece and dst in engine.list_moves(p)
+        ]
+        qualifier = ""
+        if rivals:
+            if all(p.loc.file != src.file for p in rivals):
+                qualifier = str(src)[0]
+            elif all(p.loc.rank != src.rank for p in rivals):
+                qualifier = str(src)[1]
+            else:
+                qualifier = str(src)
+        san = f"{piece.notation}{qualifier}{'x' if capture else ''}{dst}"
+
+    engine.push(piece, dst)
+    status = engine.status(piece.color.other)
+    if status.in_check:
+        san += "#" if status.nmoves == 0 else "+"
+    engine.pop()
+    return san
+
+
+def san_to_move(engine: Engine, color: Color, san: str) -> Move:
+    """The legal move for ``color`` written as ``san``."""
+    text = san.rstrip("+#!?")
+    if text.startswith("O-O") or text.startswith("0-0"):
+        raise ValueError(f"Castling is not supported: {san}")
+    if "=" in text:
+        raise ValueError(f"Promotion is not supported: {san}")
+    if len(text) < 2:
+        raise ValueError(f"Invalid SAN: {san}")
+
+    ptype = Type.PAWN
+    if text[0] in "NBRQK":
+        ptype = Piece.get_type_from_notation(text[0])
+        text = text[1:]
+    dst = Square.from_notation(text[-2:])
+    qualifier = text[:-2].replace("x", "")
+    if ptype == Type.PAWN and not qualifier:
+        # A pawn push stays on its file.
+        qualifier = str(dst)[0]
+
+    candidates = [
+        p.loc
+        for p in engine.board.pieces[ptype | color]
+        if dst in engine.list_moves(p) and all(c in str(p.loc) for c in qualifier)
+    ]
+    if len(candidates) != 1:
+        reason = "Ambiguous" if candidates else "Illegal"
+        raise ValueError(f"{reason} move: {san}")
+    return candidates[0], dst
+
+
+def read_pgn(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """Games of a PGN file, with comments, variations and NAGs dropped."""
+    game = PgnGame()
+    movetext: list[str] = []
+
+    def finish() -> Optional[PgnGame]:
+        text = _COMMENT.sub(" ", "\n".join(movetext))
+        while (stripped := _VARIATION.sub(" ", text)) != text:
+            text = stripped
+        for token in text.split():
+            token = _MOVE_NUMBER.sub("", token)
+            if not token or token.startswith("$"):
+                continue
+            if token in RESULTS:
+                game.result = token
+            else:
+                game.sans.append(token)
+        if not game.headers and not game.sans:
+            return None
+        if game.result == "*":
+            game.result = game.headers.get("Result", "*")
+        return game
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("[") and (tag := _TAG.match(line)):
+            if movetext:
+                if (done := finish()) is not None:
+                    yield done
+                game, movetext = PgnGame(), []
+            game.headers[tag.group(1)] = tag.group(2)
+        elif line and not line.startswith("%"):
+            movetext.append(line)
+    if (done := finish()) is not None:
+        yield done
+
+
+def write_pgn(
+    sans: list[str],
+    result: str,
+    headers: Optional[dict[str, str]] = None,
+    fen: Optional[str] = None,
+) -> str:
+    tags = {
+        "Event": "?",
+        "Site": "?",
+        "Date": "????.??.??",
+        "Round": "?",
+        "White": "?",
+        "Black": "?",
+        "Result": result,
+    }
+    tags.update(headers or {})
+    if fen is not None:
+        tags["SetUp"] = "1"
+        tags["FEN"] = fen
+
+    lines = [f'[{name} "{value}"]' for name, value in tags.items()]
+    lines.append("")
+
+    fields = (fen or "").split(" ")
+    color = side_to_move(fen or "")
+    number = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 1
+
+    tokens: list[str] = []
+    for i, san in enumerate(sans):
+        if color == Color.WHITE:
+            tokens.append(f"{number}.")
+        elif i == 0:
+            tokens.append(f"{number}...")
+        tokens.append(san)
+        if color == Color.BLACK:
+            number += 1
+        color = color.other
+    tokens.append(result)
+
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > 79:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
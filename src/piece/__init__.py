@@ -1,4 +1,4 @@
-from .base import Color, Piece, Type
+from .base import Color, Piece, Type, side_to_move
 from ..square import Square
 from .bishop import Bishop
 from .king import King
@@ -18,4 +18,5 @@ __all__ = [
     "Rook",
     "Queen",
     "King",
+    "side_to_move",
 ]
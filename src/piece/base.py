@@ -15,6 +15,12 @@ class Color(IntEnum):
         return Color(self.value ^ 1)
 
 
+def side_to_move(fen: str) -> Color:
+    """The side to move in ``fen``; White when the field is missing."""
+    fields = fen.split(" ")
+    return Color.BLACK if len(fields) > 1 and fields[1] == "b" else Color.WHITE
+
+
 class Type(IntEnum):
     PAWN = 0
     KNIGHT = 2
@@ -0,0 +1,314 @@
+from typing import Any, Iterator, Optional
+
+from .engine import Engine, Move
+from .piece import Color, Piece, Type
+from .square import Square
+from .tables import BISHOP_RAYS, KING_STEPS, KNIGHT_STEPS, LINE, ROOK_RAYS
+
+SQUARES = [Square(sq) for sq in range(64)]
+
+
+def _pawn_attacks(color: Color) -> list[list[int]]:
+    step = 1 if color == Color.WHITE else -1
+    table: list[list[int]] = []
+    for sq in range(64):
+        s = Square(sq)
+        table.append(
+            [int(t) for df in (-1, 1) if (t := s.move_dir(df, step)) is not None]
+        )
+    return table
+
+
+# PAWN_ATTACKS[color][sq]: squares a pawn of ``color`` on ``sq`` attacks; the
+# pawns of ``color`` attacking ``sq`` stand on PAWN_ATTACKS[color ^ 1][sq].
+PAWN_ATTACKS = [_pawn_attacks(color) for color in Color]
+SLIDER_RAYS: dict[int, list[list[list[int]]]] = {
+    Type.BISHOP: BISHOP_RAYS,
+    Type.ROOK: ROOK_RAYS,
+    Type.QUEEN: [r + b for r, b in zip(ROOK_RAYS, BISHOP_RAYS)],
+}
+
+
+class PseudoEngine(Engine):
+    """Engine backend with pseudo-legal move generation.
+
+    Moves come straight from the lookup tables and a move is only checked
+    for leaving the king in check when it is made (:meth:`try_push`) or
+    listed as legal.  Nothing is recomputed per move, so making and taking
+    back a move is a handful of list writes.
+
+    Piece ``moves``/``ctrls`` masks and the attack board are rebuilt on
+    demand by :meth:`refresh_attacks`, with ``moves`` legal as on the legal
+    backend.  Pins are not tracked: ``pinned_or_checked`` stays empty.
+    """
+
+    def _build_attacks(self) -> None:
+        # Generation the attack board was last rebuilt for.
+        self.attacks_generation = -1
+
+    def attacked(self, sq: int, by: int) -> bool:
+        """Whether a piece of colour ``by`` attacks ``sq``."""
+        board = self.board.board
+        for t in KNIGHT_STEPS[sq]:
+            p = board[t]
+            if p is not None and p.id == Type.KNIGHT | by:
+                return True
+        for t in PAWN_ATTACKS[by ^ 1][sq]:
+            p = board[t]
+            if p is not None and p.id == Type.PAWN | by:
+                return True
+        for t in KING_STEPS[sq]:
+            p = board[t]
+            if p is not None and p.id == Type.KING | by:
+                return True
+        for rays, slider in ((ROOK_RAYS, Type.ROOK), (BISHOP_RAYS, Type.BISHOP)):
+            for ray in rays[sq]:
+                for t in ray:
+                    p = board[t]
+                    if p is not None:
+                        if p.id == slider | by or p.id == Type.QUEEN | by:
+                            return True
+                        break
+        return False
+
+    def in_check(self, color: Color) -> bool:
+        return self.attacked(self.board.get_king(color).loc, color ^ 1)
+
+    def targets(self, piece: Piece) -> Iterator[int]:
+        """Pseudo-legal destination squares of ``piece``."""
+        board = self.board.board
+        sq = piece.loc
+        color = piece.id & 1
+        kind = piece.id & 14
+        if kind == Type.PAWN:
+            step = -1 if color else 1
+            rank = (sq & 7) + step
+            if 0 <= rank < 8 and board[sq + step] is None:
+                yield sq + step
+                if not piece.has_moved and board[sq + 2 * step] is None:
+                    yield sq + 2 * step
+            ep = self.ep_candidate
+            for t in PAWN_ATTACKS[color][sq]:
+                p = board[t]
+                if p is not None:
+                    if p.id & 1 != color:
+                        yield t
+                elif ep is not None and ep.loc == t - step and ep.id & 1 != color:
+                    yield t
+        elif kind == Type.KNIGHT or kind == Type.KING:
+            for t in (KNIGHT_STEPS if kind == Type.KNIGHT else KING_STEPS)[sq]:
+                p = board[t]
+                if p is None or p.id & 1 != color:
+                    yield t
+        else:
+            for ray in SLIDER_RAYS[kind][sq]:
+                for t in ray:
+                    p = board[t]
+                    if p is None:
+                        yield t
+                    else:
+                        if p.id & 1 != color:
+                            yield t
+                        break
+
+    def is_legal(self, piece: Piece, loc: int) -> bool:
+        """Whether the pseudo-legal move of ``piece`` to ``loc`` keeps its
+        king safe, tried on the mailbox alone and taken back."""
+        board = self.board.board
+        src = piece.loc
+        victim_sq = loc
+        victim = board[loc]
+        if victim is None and piece.id & 14 == Type.PAWN and (src ^ loc) & ~7:
+            victim_sq = (loc & ~7) | (src & 7)  # en passant
+            victim = board[victim_sq]
+        color = piece.id & 1
+        board[src] = None
+        board[victim_sq] = None
+        board[loc] = piece
+        king = loc if piece.id & 14 == Type.KING else self.board.get_king(color).loc
+        legal = not self.attacked(king, color ^ 1)
+        board[loc] = None
+        board[victim_sq] = victim
+        board[src] = piece
+        return legal
+
+    def can_capture_ep(self, color: Color) -> bool:
+        ep = self.ep_candidate
+        if ep is None or ep.color == color:
+            return False
+        target = ep.loc - 1 if color == Color.BLACK else ep.loc + 1
+        return any(self.is_legal(p, target) for p in self.ep_capturers(ep, ep.loc))
+
+    def gen_pseudo_moves(self, color: Color) -> Iterator[Move]:
+        for piece in self.board.get_all_pieces(color):
+            src = SQUARES[piece.loc]
+            for t in self.targets(piece):
+                yield src, SQUARES[t]
+
+    def gen_moves(self, color: Color) -> Iterator[Move]:
+        for piece in self.board.get_all_pieces(color):
+            src = SQUARES[piece.loc]
+            for t in list(self.targets(piece)):
+                if self.is_legal(piece, t):
+                    yield src, SQUARES[t]
+
+    def list_moves(self, piece: Piece) -> list[Square]:
+        return [
+            SQUARES[t] for t in list(self.targets(piece)) if self.is_legal(piece, t)
+        ]
+
+    def _count_moves(self, color: Color) -> int:
+        return sum(1 for _ in self.gen_moves(color))
+
+    def refresh_attacks(self) -> None:
+        if self.attacks_generation == self.generation:
+            return
+        fboard: list[list[Piece]] = [[] for _ in range(64)]
+        board = self.board.board
+        kings = [self.board.get_king(color).loc for color in Color]
+        checked = [self.in_check(color) for color in Color]
+        for plist in self.board.pieces:
+            for p in plist:
+                targets = list(self.targets(p))
+                pseudo = 0
+                for t in targets:
+                    pseudo |= 1 << t
+                color = p.id & 1
+                kind = p.id & 14
+                if checked[color] or kind == Type.KING or LINE[kings[color]][p.loc]:
+                    # The king, a piece that may be pinned, or any piece
+                    # when in check: keep only moves that leave the king safe.
+                    moves = 0
+                    for t in targets:
+                        if self.is_legal(p, t):
+                            moves |= 1 << t
+                else:
+                    moves = pseudo
+                    if kind == Type.PAWN and self.ep_candidate is not None:
+                        # En passant also takes a pawn off the king's lines.
+                        for t in targets:
+                            if board[t] is None and (p.loc ^ t) & ~7:
+                                if not self.is_legal(p, t):
+                                    moves ^= 1 << t
+                if kind == Type.PAWN:
+                    ctrls = 0
+                    for t in PAWN_ATTACKS[color][p.loc]:
+                        ctrls |= 1 << t
+                else:
+                    # Pinned pieces still attack; squares of own pieces
+                    # count as defended.
+                    ctrls = pseudo
+                    for t in self._defended(p, board):
+                        ctrls |= 1 << t
+                p.moves = moves
+                p.ctrls = ctrls
+                bb = ctrls
+                while bb:
+                    lsb = bb & -bb
+                    fboard[lsb.bit_length() - 1].append(p)
+                    bb ^= lsb
+        self.fboard.board = fboard
+        self.attacks_generation = self.generation
+
+    def _defended(self, piece: Piece, board: list[Optional[Piece]]) -> Iterator[int]:
+        color = piece.id & 1
+        kind = piece.id & 14
+        if kind == Type.KNIGHT or kind == Type.KING:
+            for t in (KNIGHT_STEPS if kind == Type.KNIGHT else KING_STEPS)[piece.loc]:
+                p = board[t]
+                if p is not None and p.id & 1 == color:
+                    yield t
+            return
+        for ray in SLIDER_RAYS[kind][piece.loc]:
+            for t in ray:
+                p = board[t]
+                if p is not None:
+                    if p.id & 1 == color:
+                        yield t
+                    break
+
+    def see(self, from_sq: Square, to_sq: Square) -> int:
+        self.refresh_attacks()
+        return super().see(from_sq, to_sq)
+
+    def move_piece(self, piece: Piece, loc: Square) -> None:
+        self._make(piece, loc)
+
+    def _make(self, piece: Piece, loc: Square) -> tuple[Any, ...]:
+        board = self.board
+        target = board.board[loc]
+        pawn = piece.id & 14 == Type.PAWN
+        if target is None and pawn and (piece.loc ^ loc) & ~7:
+            target = board.board[(loc & ~7) | (piece.loc & 7)]  # en passant
+        undo = (
+            piece,
+            piece.loc,
+            piece.has_moved,
+            target,
+            self.ep_candidate,
+            self.halfmove_clock,
+            board.hash,
+            board.pawn_hash,
+        )
+        if target is not None:
+            board.capture(target)
+        if pawn or target is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        self.ep_candidate = piece if pawn and abs(piece.loc - loc) == 2 else None
+        board.move_piece(piece, loc)
+        self.generation += 1
+        self.record_position(Color(piece.id & 1 ^ 1))
+        return undo
+
+    def push(self, piece: Piece, loc: Square) -> None:
+        self.undo_stack.append(self._make(piece, loc))
+
+    def try_push(self, piece: Piece, loc: Square) -> bool:
+        color = piece.id & 1
+        self.push(piece, loc)
+        if self.attacked(self.board.get_king(Color(color)).loc, color ^ 1):
+            self.pop()
+            return False
+        return True
+
+    def push_null(self, color: Color) -> None:
+        board = self.board
+        self.undo_stack.append(
+            (
+                None,
+                None,
+                None,
+                None,
+                self.ep_candidate,
+                self.halfmove_clock,
+                board.hash,
+                board.pawn_hash,
+            )
+        )
+        self.ep_candidate = None
+        self.generation += 1
+        self.record_position(color.other)
+
+    def rewind(self) -> None:
+        while self.undo_stack:
+            self.pop()
+
+    def _restore(self, snapshot: tuple[Any, ...]) -> None:
+        piece, loc, has_moved, target, ep, clock, h, pawn_h = snapshot
+        board = self.board
+        if piece is not None:
+            board.board[piece.loc] = None
+            board.board[loc] = piece
+            piece.loc = loc
+            piece.has_moved = has_moved
+            if target is not None:
+                target.captured = False
+                board.board[target.loc] = target
+                board.pieces[target.id].append(target)
+        board.hash = h
+        board.pawn_hash = pawn_h
+        self.ep_candidate = ep
+        self.halfmove_clock = clock
+        self.generation += 1
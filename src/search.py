@@ -0,0 +1,446 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from .bitbase import WDL
+from .engine import Engine, Move
+from .evaluate import PIECE_VALUES, evaluate, mop_up
+from .piece import Color, Type
+
+if TYPE_CHECKING:
+    from .telemetry import Telemetry
+
+MATE = 100_000
+INF = MATE + 1
+KNOWN_WIN = MATE // 2
+MAX_PLY = 128
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+NULL_MOVE_MIN_DEPTH = 3
+LMR_MIN_DEPTH = 3
+LMR_FULL_MOVES = 3
+ASPIRATION_WINDOW = 50
+
+
+class SearchAborted(Exception):
+    pass
+
+
+@dataclass
+class SearchResult:
+    move: Optional[Move] = None
+    score: int = 0
+    depth: int = 0
+    pv: list[Move] = field(default_factory=list)
+    nodes: int = 0
+
+
+class Search:
+    """Iterative-deepening alpha-beta over :meth:`Engine.push`/:meth:`Engine.pop`.
+
+    The transposition table lives on the instance, so consecutive searches
+    (including a ponder search followed by the real one) reuse it.
+
+    Besides ``nodes`` a few plain counters are kept for tuning; attaching a
+    :class:`~src.telemetry.Telemetry` breaks them down per iteration.
+    """
+
+    def __init__(
+        self,
+        tt_size: int = 1 << 18,
+        null_move: bool = True,
+        lmr: bool = True,
+        aspiration: bool = True,
+        telemetry: Optional["Telemetry"] = None,
+    ) -> None:
+        self.tt: dict[int, tuple[int, int, int, Optional[Move]]] = {}
+        self.tt_size = tt_size
+        self.null_move = null_move
+        self.lmr = lmr
+        self.aspiration = aspiration
+        self.telemetry = telemetry
+        self.stop = threading.Event()
+        self.deadline: Optional[float] = None
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+
+    def start(self, time_limit: Optional[float]) -> None:
+        self.stop.clear()
+        self.nodes = self.qnodes = 0
+        self.tt_probes = self.tt_hits = 0
+        self.cutoffs = self.first_cutoffs = 0
+        self.deadline = None
+        if time_limit is not None:
+            self.deadline = time.perf_counter() + time_limit
+        if self.telemetry is not None:
+            self.telemetry.begin_search()
+
+    def counters(self) -> tuple[int, int, int, int, int, int]:
+        return (
+            self.nodes,
+            self.qnodes,
+            self.tt_probes,
+            self.tt_hits,
+            self.cutoffs,
+            self.first_cutoffs,
+        )
+
+    def think(
+        self,
+        engine: Engine,
+        color: Color,
+        max_depth: int = MAX_PLY,
+        time_limit: Optional[float] = 1.0,
+    ) -> SearchResult:
+        self.start(time_limit)
+        return self.iterate(engine, color, max_depth)
+
+    def iterate(self, engine: Engine, color: Color, max_depth: int) -> SearchResult:
+        result = SearchResult()
+        root = len(engine.undo_stack)
+        telemetry = self.telemetry
+        for depth in range(1, max_depth + 1):
+            if telemetry is not None:
+                telemetry.begin(self)
+            try:
+                score = self.search_root(engine, color, depth, result.score)
+            except SearchAborted:
+                while len(engine.undo_stack) > root:
+                    engine.pop()
+                break
+            pv = self.pv(engine, color, depth)
+            if telemetry is not None:
+                telemetry.end(self, depth, score, pv)
+            result = SearchResult(pv[0] if pv else None, score, depth, pv, self.nodes)
+            if abs(score) >= MATE - MAX_PLY:
+                break
+
+        if result.move is None:
+            result.move = next(engine.gen_moves(color), None)
+            result.nodes = self.nodes
+        return result
+
+    def search_root(
+        self, engine: Engine, color: Color, depth: int, previous: int
+    ) -> int:
+        if not self.aspiration or depth < 3 or abs(previous) >= KNOWN_WIN:
+            return self.negamax(engine, color, depth, -INF, INF, 0)
+        # Search a narrow window around the previous score, widening the
+        # side that fails until the score falls inside.
+        window = ASPIRATION_WINDOW
+        alpha, beta = previous - window, previous + window
+        while True:
+            score = self.negamax(engine, color, depth, alpha, beta, 0)
+            if score <= alpha:
+                alpha = max(alpha - window, -INF)
+            elif score >= beta:
+                beta = min(beta + window, INF)
+            else:
+                return score
+            window *= 2
+
+    def _check_abort(self) -> None:
+        if self.stop.is_set():
+            raise SearchAborted
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchAborted
+
+    def order_moves(
+        self, engine: Engine, color: Color, tt_move: Optional[Move]
+    ) -> list[Move]:
+        def rank(move: Move) -> int:
+            if move == tt_move:
+                return -INF
+            target = engine.get_piece(move[1])
+            if target is None:
+                return 0
+            attacker = engine.get_piece(move[0])
+            assert attacker is not None
+            return PIECE_VALUES[attacker.type] - 10 * PIECE_VALUES[target.type]
+
+        # Ties go by move, so every backend searches the same tree whatever
+        # order it generates moves in.
+        return sorted(
+            engine.gen_pseudo_moves(color), key=lambda move: (rank(move), move)
+        )
+
+    def negamax(
+        self,
+        engine: Engine,
+        color: Color,
+        depth: int,
+        alpha: int,
+        beta: int,
+        ply: int,
+        null_ok: bool = True,
+    ) -> int:
+        self.nodes += 1
+        if self.nodes & 63 == 0:
+            self._check_abort()
+
+        if ply > 0:
+            # A single repetition inside the tree is scored as the draw it
+            # can be forced into.
+            if engine.is_repetition(2) or engine.is_fifty_moves():
+                return 0
+            wdl = engine.probe(color)
+            if wdl is not None:
+                if wdl == WDL.DRAW:
+                    return 0
+                winner = color if wdl == WDL.WIN else color.other
+                return wdl * (KNOWN_WIN - ply + mop_up(engine, winner))
+
+        if depth <= 0:
+            return self.quiesce(engine, color, alpha, beta, ply)
+
+        key = engine.key(color)
+        entry = self.tt.get(key)
+        tt_move: Optional[Move] = None
+        self.tt_probes += 1
+        if entry is not None:
+            self.tt_hits += 1
+            e_depth, e_score, e_flag, tt_move = entry
+            e_score = _from_tt(e_score, ply)
+            if ply > 0 and e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_score
+                if e_flag == LOWER and e_score >= beta:
+                    return e_score
+                if e_flag == UPPER and e_score <= alpha:
+                    return e_score
+
+        in_check = engine.in_check(color)
+        if (
+            self.null_move
+            and null_ok
+            and ply > 0
+            and depth >= NULL_MOVE_MIN_DEPTH
+            and not in_check
+            and abs(beta) < KNOWN_WIN
+            and _has_pieces(engine, color)
+        ):
+            # If passing still fails high, a real move will too.
+            reduction = 3 if depth > 6 else 2
+            engine.push_null(color)
+            score = -self.negamax(
+                engine,
+                color.other,
+                depth - 1 - reduction,
+                -beta,
+                -beta + 1,
+                ply + 1,
+                False,
+            )
+            engine.pop()
+            if score >= beta:
+                return beta
+
+        alpha_orig = alpha
+        best = -INF
+        best_move: Optional[Move] = None
+        # Legal moves searched so far; pseudo-legal ones are skipped.
+        i = -1
+        for src, dst in self.order_moves(engine, color, tt_move):
+            piece = engine.get_piece(src)
+            assert piece is not None
+            quiet = engine.get_piece(dst) is None
+            if not engine.try_push(piece, dst):
+                continue
+            i += 1
+            if (
+                self.lmr
+                and i >= LMR_FULL_MOVES
+                and depth >= LMR_MIN_DEPTH
+                and quiet
+                and not in_check
+                and not engine.in_check(color.other)
+            ):
+                # Late quiet moves get a reduced null-window search first and
+                # are searched in full only if they beat alpha.
+                reduction = 2 if i >= 2 * LMR_FULL_MOVES + 2 else 1
+                score = -self.negamax(
+                    engine,
+                    color.other,
+                    depth - 1 - reduction,
+                    -alpha - 1,
+                    -alpha,
+                    ply + 1,
+                )
+                if score > alpha:
+                    score = -self.negamax(
+                        engine, color.other, depth - 1, -beta, -alpha, ply + 1
+                    )
+            else:
+                score = -self.negamax(
+                    engine, color.other, depth - 1, -beta, -alpha, ply + 1
+                )
+            engine.pop()
+            if score > best:
+                best, best_move = score, (src, dst)
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.cutoffs += 1
+                if i == 0:
+                    self.first_cutoffs += 1
+                break
+
+        if best_move is None:
+            return -MATE + ply if in_check else 0
+
+        flag = EXACT
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        self.store(key, depth, _to_tt(best, ply), flag, best_move)
+        return best
+
+    def quiesce(
+        self, engine: Engine, color: Color, alpha: int, beta: int, ply: int
+    ) -> int:
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes & 63 == 0:
+            self._check_abort()
+
+        stand_pat = evaluate(engine, color)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        for src, dst in self.order_moves(engine, color, None):
+            if engine.get_piece(dst) is None:
+                continue
+            if engine.see(src, dst) < 0:
+                # Losing captures cannot raise the stand-pat score.
+                continue
+            piece = engine.get_piece(src)
+            assert piece is not None
+            if not engine.try_push(piece, dst):
+                continue
+            score = -self.quiesce(engine, color.other, -beta, -alpha, ply + 1)
+            engine.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def store(
+        self, key: int, depth: int, score: int, flag: int, move: Optional[Move]
+    ) -> None:
+        if key not in self.tt and len(self.tt) >= self.tt_size:
+            del self.tt[next(iter(self.tt))]
+        self.tt[key] = (depth, score, flag, move)
+
+    def pv(self, engine: Engine, color: Color, depth: int) -> list[Move]:
+        line: list[Move] = []
+        seen: set[int] = set()
+        while len(line) < depth:
+            key = engine.key(color)
+            entry = self.tt.get(key)
+            if entry is None or entry[3] is None or key in seen:
+                break
+            move = entry[3]
+            if move not in engine.gen_moves(color):
+                break
+            seen.add(key)
+            piece = engine.get_piece(move[0])
+            assert piece is not None
+            engine.push(piece, move[1])
+            line.append(move)
+            color = color.other
+        for _ in line:
+            engine.pop()
+        return line
+
+
+def _has_pieces(engine: Engine, color: Color) -> bool:
+    # Null-move pruning is unsafe in pawn endings, where zugzwang is common.
+    pieces = engine.board.pieces
+    return any(
+        pieces[t | color] for t in (Type.KNIGHT, Type.BISHOP, Type.ROOK, Type.QUEEN)
+    )
+
+
+def _to_tt(score: int, ply: int) -> int:
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _from_tt(score: int, ply: int) -> int:
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+
+class Ponderer:
+    """Searches the reply to an expected move while the opponent thinks.
+
+    On a ponder hit the background search keeps running until the normal
+    time budget (counted from when pondering began) is spent, then its
+    result is used; on a miss it is stopped and discarded, leaving the
+    transposition table warm for the real search.
+    """
+
+    def __init__(self, search: Search, time_limit: float) -> None:
+        self.search = search
+        self.time_limit = time_limit
+        self.thread: Optional[threading.Thread] = None
+        self.guess: Optional[Move] = None
+        self.result = SearchResult()
+        self.started = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.thread is not None
+
+    def start(self, engine: Engine, color: Color, guess: Move) -> None:
+        """Ponder ``color``'s reply to ``guess`` played by the opponent."""
+        self.cancel()
+        clone = engine.copy()
+        piece = clone.get_piece(guess[0])
+        assert piece is not None
+        clone.move_piece(piece, guess[1])
+
+        self.guess = guess
+        self.result = SearchResult()
+        self.started = time.perf_counter()
+        self.search.start(None)
+        self.thread = threading.Thread(
+            target=self._run, args=(clone, color), daemon=True
+        )
+        self.thread.start()
+
+    def _run(self, engine: Engine, color: Color) -> None:
+        self.result = self.search.iterate(engine, color, MAX_PLY)
+
+    def resolve(self, played: Move) -> Optional[SearchResult]:
+        """Finish pondering; returns the search result on a ponder hit."""
+        if self.thread is None:
+            return None
+        if played != self.guess:
+            self.cancel()
+            return None
+        self.search.deadline = self.started + self.time_limit
+        self.thread.join()
+        self.thread = None
+        return self.result
+
+    def cancel(self) -> None:
+        if self.thread is None:
+            return
+        self.search.stop.set()
+        self.thread.join()
+        self.thread = None
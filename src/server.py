@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .engine import Engine, Move
+from .movecache import MoveCache
+from .piece import Color, side_to_move
+from .search import Search
+from .square import Square
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+
+HELP = (
+    "new [fen] | move ID UCI | go ID [depth] [seconds] | moves ID | "
+    "status ID | undo ID | close ID | stats | quit"
+)
+
+
+class EnginePool:
+    """Idle engines per starting FEN, rewound in place for the next game.
+
+    At most ``max_idle`` engines are kept in all; beyond that the FEN used
+    least recently loses its engines first.  All engines share one move
+    cache, so positions every game passes through (the start, popular
+    openings, positions revisited by ``undo``) are generated once.
+    """
+
+    def __init__(self, max_idle: int = 64, cache_size: int = 1 << 16) -> None:
+        self.max_idle = max_idle
+        self.idle: OrderedDict[str, list[Engine]] = OrderedDict()
+        self.size = 0
+        self.move_cache = MoveCache(cache_size)
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, fen: str) -> Engine:
+        idle = self.idle.get(fen)
+        if idle:
+            self.reused += 1
+            self.size -= 1
+            engine = idle.pop()
+            if idle:
+                self.idle.move_to_end(fen)
+            else:
+                del self.idle[fen]
+            return engine
+        self.created += 1
+        engine = Engine(fen)
+        engine.move_cache = self.move_cache
+        return engine
+
+    def release(self, engine: Engine) -> None:
+        engine.rewind()
+        self.idle.setdefault(engine.fen, []).append(engine)
+        self.idle.move_to_end(engine.fen)
+        self.size += 1
+        while self.size > self.max_idle:
+            fen, oldest = next(iter(self.idle.items()))
+            oldest.pop()
+            self.size -= 1
+            if not oldest:
+                del self.idle[fen]
+
+
+class Latency:
+    """Recent request latencies per command, for percentile reports."""
+
+    def __init__(self, window: int = 10_000) -> None:
+        self.samples: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+
+    def add(self, command: str, seconds: float) -> None:
+        self.samples[command].append(seconds)
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        report: dict[str, dict[str, float]] = {}
+        for command, samples in self.samples.items():
+            ordered = sorted(samples)
+            n = len(ordered)
+            report[command] = {"count": n} | {
+                f"p{q}_ms": ordered[min(n - 1, n * q // 100)] * 1e3
+                for q in (50, 90, 99)
+            }
+        return report
+
+
+@dataclass
+class Session:
+    engine: Engine
+    turn: Color
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _think(
+    engine: Engine, color: Color, depth: int, seconds: Optional[float]
+) -> Optional[Move]:
+    return Search(1 << 16).think(engine, color, depth, seconds).move
+
+
+def _think_packed(data: bytes, depth: int, seconds: Optional[float]) -> Optional[Move]:
+    # Process workers get the 36-byte encoding rather than a pickled engine.
+    engine, color = Engine.decode(data)
+    return _think(engine, color, depth, seconds)
+
+
+def _parse_move(text: str) -> Move:
+    if len(text) != 4:
+        raise ValueError(f"Bad move: {text}")
+    return Square.from_notation(text[:2]), Square.from_notation(text[2:])
+
+
+class Server:
+    """Hosts many games over a line protocol, one command per line.
+
+    Replies start with ``ok`` or ``err``.  Engine searches run in
+    ``executor`` so the event loop keeps serving other games meanwhile.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_idle: int = 64):
+        self.executor = executor or ThreadPoolExecutor()
+        self.pool = EnginePool(max_idle)
+        self.latency = Latency()
+        self.sessions: dict[int, Session] = {}
+        self.ids = itertools.count(1)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        owned: set[int] = set()
+        try:
+            while line := await reader.readline():
+                words = line.decode().split()
+                if not words:
+                    continue
+                if words[0] == "quit":
+                    break
+                start = time.perf_counter()
+                try:
+                    reply = "ok " + await self.dispatch(words, owned)
+                except (ValueError, IndexError, KeyError) as e:
+                    # A malformed command must not take the connection down.
+                    reply = f"err {e}"
+                self.latency.add(words[0], time.perf_counter() - start)
+                writer.write(reply.rstrip().encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                await self.close(game_id)
+            writer.close()
+
+    async def dispatch(self, words: list[str], owned: set[int]) -> str:
+        command, args = words[0], words[1:]
+        if command == "new":
+            game_id = self.new(" ".join(args) or START_FEN)
+            owned.add(game_id)
+            return str(game_id)
+        if command == "stats":
+            report = {
+                "games": len(self.sessions),
+                "engines_created": self.pool.created,
+                "engines_reused": self.pool.reused,
+                "move_cache": self.pool.move_cache.stats(),
+                "latency": self.latency.percentiles(),
+            }
+            return json.dumps(report)
+        if command == "help":
+            return HELP
+        if not args:
+            raise ValueError(f"Usage: {HELP}")
+
+        game_id = int(args[0])
+        if game_id not in owned:
+            raise KeyError(f"no game {game_id}")
+        if command == "close":
+            owned.discard(game_id)
+            await self.close(game_id)
+            return ""
+        session = self.sessions[game_id]
+        async with session.lock:
+            if command == "move":
+                if len(args) < 2:
+                    raise ValueError(f"Usage: {HELP}")
+                return self.play(session, _parse_move(args[1]))
+            if command == "go":
+                depth = int(args[1]) if len(args) > 1 else 3
+                seconds = float(args[2]) if len(args) > 2 else None
+                loop = asyncio.get_running_loop()
+                if isinstance(self.executor, ProcessPoolExecutor):
+                    data = session.engine.encode(session.turn)
+                    future = loop.run_in_executor(
+                        self.executor, _think_packed, data, depth, seconds
+                    )
+                else:
+                    future = loop.run_in_executor(
+                        self.executor,
+                        _think,
+                        session.engine,
+                        session.turn,
+                        depth,
+                        seconds,
+                    )
+                move = await future
+                if move is None:
+                    raise ValueError("no legal moves")
+                return f"{move[0]}{move[1]} {self.play(session, move)}"
+            if command == "moves":
+                return " ".join(
+                    f"{src}{dst}"
+                    for src, dst in session.engine.legal_moves(session.turn)
+                )
+            if command == "status":
+                status = session.engine.status(session.turn)
+                return (
+                    f"{session.turn.name.lower()} {status.nmoves}"
+                    f" {'check' if status.in_check else '-'} {status.result or '-'}"
+                )
+            if command == "undo":
+                if not session.engine.undo_stack:
+                    raise ValueError("nothing to undo")
+                session.engine.pop()
+                session.turn = session.turn.other
+                return ""
+        raise ValueError(f"unknown command {command}")
+
+    def new(self, fen: str) -> int:
+        engine = self.pool.acquire(fen)
+        game_id = next(self.ids)
+        self.sessions[game_id] = Session(engine, side_to_move(fen))
+        return game_id
+
+    def play(self, session: Session, move: Move) -> str:
+        engine = session.engine
+        if engine.status(session.turn).is_over:
+            raise ValueError("game is over")
+        if move not in engine.legal_moves(session.turn):
+            raise ValueError(f"illegal move {move[0]}{move[1]}")
+        piece = engine.get_piece(move[0])
+        assert piece is not None
+        engine.push(piece, move[1])
+        session.turn = session.turn.other
+        return engine.status(session.turn).result or "-"
+
+    async def close(self, game_id: int) -> None:
+        session = self.sessions.pop(game_id, None)
+        if session is not None:
+            # Wait for a search still running on the engine.
+            async with session.lock:
+                self.pool.release(session.engine)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 7878) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve chess games over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--processes", action="store_true", help="search in processes, not threads"
+    )
+    args = parser.parse_args()
+
+    executor: Executor
+    if args.processes:
+        executor = ProcessPoolExecutor(args.workers)
+    else:
+        executor = ThreadPoolExecutor(args.workers)
+    server = Server(executor)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+        print(json.dumps(server.latency.percentiles(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import cProfile
+import json
+import pstats
+import random
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from .engine import Engine
+    from .piece import Color
+
+# Engine methods timed by EngineStats.  Times are inclusive: update_fboard
+# calls made from add_pin or handle_checks count towards both phases.
+PHASES: tuple[str, ...] = (
+    "move_piece",
+    "handle_pawn_move",
+    "gather_recalc_targets",
+    "update_fboard",
+    "add_pin",
+    "remove_pin",
+    "handle_checks",
+    "discover_pins",
+    "filter_pins",
+)
+
+
+class EngineStats:
+    """Call counts and timings for the phases of :meth:`Engine.move_piece`.
+
+    Installing shadows the phase methods with timing wrappers on the
+    instance only; uninstalling deletes them again, so an engine without
+    stats runs the plain class methods with no extra work.
+    """
+
+    def __init__(self) -> None:
+        self.calls: dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.time_ns: dict[str, int] = dict.fromkeys(PHASES, 0)
+        # Number of update_fboard calls triggered by each move.
+        self.cascades: Counter[int] = Counter()
+
+    def reset(self) -> None:
+        # Cleared in place: installed wrappers hold on to these dicts.
+        for name in PHASES:
+            self.calls[name] = 0
+            self.time_ns[name] = 0
+        self.cascades.clear()
+
+    def install(self, engine: "Engine") -> None:
+        for name in PHASES:
+            setattr(engine, name, self._wrap(engine, name))
+        engine.stats_collector = self
+
+    def uninstall(self, engine: "Engine") -> None:
+        for name in PHASES:
+            engine.__dict__.pop(name, None)
+        engine.stats_collector = None
+
+    def _wrap(self, engine: "Engine", name: str) -> Callable[..., Any]:
+        func = getattr(engine, name)
+        calls = self.calls
+        time_ns = self.time_ns
+        clock = time.perf_counter_ns
+
+        if name == "move_piece":
+
+            def wrapper(*args: Any) -> Any:
+                before = calls["update_fboard"]
+                start = clock()
+                result = func(*args)
+                time_ns[name] += clock() - start
+                calls[name] += 1
+                self.cascades[calls["update_fboard"] - before] += 1
+                return result
+
+        else:
+
+            def wrapper(*args: Any) -> Any:
+                start = clock()
+                result = func(*args)
+                time_ns[name] += clock() - start
+                calls[name] += 1
+                return result
+
+        return wrapper
+
+    def snapshot(self) -> dict[str, Any]:
+        phases = {
+            name: {
+                "calls": self.calls[name],
+                "total_ms": self.time_ns[name] / 1e6,
+                "mean_us": (
+                    self.time_ns[name] / self.calls[name] / 1e3
+                    if self.calls[name]
+                    else 0.0
+                ),
+            }
+            for name in PHASES
+        }
+        moves = self.calls["move_piece"]
+        return {
+            "moves": moves,
+            "phases": phases,
+            "cascade": {
+                "mean": self.calls["update_fboard"] / moves if moves else 0.0,
+                "max": max(self.cascades, default=0),
+                "histogram": {
+                    str(size): count for size, count in sorted(self.cascades.items())
+                },
+            },
+        }
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+def profile(
+    func: Callable[..., Any], *args: Any, path: Optional[str] = None
+) -> pstats.Stats:
+    """Run ``func`` under cProfile, optionally saving the raw profile."""
+    profiler = cProfile.Profile()
+    profiler.runcall(func, *args)
+    if path is not None:
+        profiler.dump_stats(path)
+    return pstats.Stats(profiler)
+
+
+def play_random(engine: "Engine", plies: int, seed: int = 0) -> int:
+    """Play up to ``plies`` random legal moves; returns the number played."""
+    from .piece import side_to_move
+
+    rng = random.Random(seed)
+    color = side_to_move(engine.fen)
+    for played in range(plies):
+        if engine.status(color).is_over:
+            return played
+        src, dst = rng.choice(list(engine.gen_moves(color)))
+        piece = engine.get_piece(src)
+        assert piece is not None
+        engine.move_piece(piece, dst)
+        color = color.other
+    return plies
+
+
+def perft(engine: "Engine", color: "Color", depth: int) -> int:
+    """Leaf count of the legal move tree, made and taken back with
+    :meth:`Engine.try_push` and :meth:`Engine.pop`."""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for src, dst in list(engine.gen_pseudo_moves(color)):
+        piece = engine.get_piece(src)
+        assert piece is not None
+        if engine.try_push(piece, dst):
+            nodes += perft(engine, color.other, depth - 1)
+            engine.pop()
+    return nodes
+
+
+def main() -> None:
+    from .engine import Engine
+
+    parser = argparse.ArgumentParser(
+        description="Profile Engine.move_piece over a random game."
+    )
+    parser.add_argument("--fen", default=None)
+    parser.add_argument("--plies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the phase statistics here")
+    parser.add_argument("--profile", help="write a cProfile dump here")
+    args = parser.parse_args()
+
+    engine = Engine(args.fen)
+    stats = engine.enable_stats()
+    if args.profile:
+        profile(play_random, engine, args.plies, args.seed, path=args.profile)
+    else:
+        play_random(engine, args.plies, args.seed)
+    if args.json:
+        stats.dump(args.json)
+
+    snapshot = stats.snapshot()
+    print(f"{snapshot['moves']} moves")
+    for name, phase in snapshot["phases"].items():
+        print(
+            f"{name:<22} {phase['calls']:>8} calls {phase['total_ms']:>10.2f} ms"
+            f" {phase['mean_us']:>9.1f} us/call"
+        )
+    cascade = snapshot["cascade"]
+    print(f"update_fboard per move: {cascade['mean']:.1f} (max {cascade['max']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import marshal
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from .square import Square
+
+# Bump whenever the generated tables change; older cache files are ignored.
+VERSION = 1
+MAGIC = b"CTBL"
+
+ORTHOGONAL = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIAGONAL = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+KNIGHT_DIRS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+
+
+def _steps(dirs: list[tuple[int, int]]) -> list[list[int]]:
+    table: list[list[int]] = []
+    for sq in range(64):
+        s = Square(sq)
+        table.append(
+            [int(t) for df, dr in dirs if (t := s.move_dir(df, dr)) is not None]
+        )
+    return table
+
+
+def _mask(steps: list[list[int]]) -> list[int]:
+    return [sum(1 << t for t in targets) for targets in steps]
+
+
+def _rays(dirs: list[tuple[int, int]]) -> list[list[list[int]]]:
+    table: list[list[list[int]]] = []
+    for sq in range(64):
+        rays: list[list[int]] = []
+        for df, dr in dirs:
+            ray: list[int] = []
+            s: Optional[Square] = Square(sq)
+            while s is not None and (s := s.move_dir(df, dr)) is not None:
+                ray.append(int(s))
+            rays.append(ray)
+        table.append(rays)
+    return table
+
+
+def generate() -> dict[str, Any]:
+    king_steps = _steps(ORTHOGONAL + DIAGONAL)
+    knight_steps = _steps(KNIGHT_DIRS)
+    rook_rays = _rays(ORTHOGONAL)
+    bishop_rays = _rays(DIAGONAL)
+
+    # BETWEEN[a][b]: squares strictly between a and b, LINE[a][b]: 1 if a and
+    # b share a rank or file, 2 if they share a diagonal, 0 otherwise.
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for kind, rays in ((1, rook_rays), (2, bishop_rays)):
+        for sq in range(64):
+            for ray in rays[sq]:
+                mask = 0
+                for t in ray:
+                    between[sq][t] = mask
+                    line[sq][t] = kind
+                    mask |= 1 << t
+
+    return {
+        "KING_STEPS": king_steps,
+        "KNIGHT_STEPS": knight_steps,
+        "KING_MASK": _mask(king_steps),
+        "KNIGHT_MASK": _mask(knight_steps),
+        "PAWN_MASK": _mask(_steps([(-1, 1), (1, 1)])),
+        "ROOK_RAYS": rook_rays,
+        "BISHOP_RAYS": bishop_rays,
+        "BETWEEN": between,
+        "LINE": line,
+    }
+
+
+def cache_path() -> Path:
+    base = os.environ.get("CHESS_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+        "chess-engine",
+    )
+    return Path(base) / f"tables-v{VERSION}-m{marshal.version}.bin"
+
+
+def _header() -> bytes:
+    return MAGIC + bytes((VERSION, marshal.version))
+
+
+def load(path: Optional[Path] = None) -> dict[str, Any]:
+    """Tables from the on-disk cache, generating and saving them on a miss.
+
+    The cache is a single marshal blob read in one call; a stale or corrupt
+    file is regenerated, and an unwritable cache directory only costs the
+    generation time.
+    """
+    path = path or cache_path()
+    header = _header()
+    try:
+        data = path.read_bytes()
+        if data[: len(header)] == header:
+            return marshal.loads(data[len(header) :])
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    tables = generate()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(header + marshal.dumps(tables))
+        # Atomic, so concurrently starting workers never read a partial file.
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return tables
+
+
+_TABLES = load()
+
+KING_STEPS: list[list[int]] = _TABLES["KING_STEPS"]
+KNIGHT_STEPS: list[list[int]] = _TABLES["KNIGHT_STEPS"]
+KING_MASK: list[int] = _TABLES["KING_MASK"]
+KNIGHT_MASK: list[int] = _TABLES["KNIGHT_MASK"]
+PAWN_MASK: list[int] = _TABLES["PAWN_MASK"]
+ROOK_RAYS: list[list[list[int]]] = _TABLES["ROOK_RAYS"]
+BISHOP_RAYS: list[list[list[int]]] = _TABLES["BISHOP_RAYS"]
+BETWEEN: list[list[int]] = _TABLES["BETWEEN"]
+LINE: list[list[int]] = _TABLES["LINE"]
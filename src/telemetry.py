@@ -0,0 +1,157 @@
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, TextIO
+
+from .engine import BACKENDS, Move, create_engine
+from .piece import side_to_move
+from .search import MATE, MAX_PLY, Search
+
+
+@dataclass
+class IterationStats:
+    """Work done by one iterative-deepening iteration.
+
+    ``nodes`` includes the quiescence nodes counted in ``qnodes``.
+    ``cutoffs`` are beta cutoffs in the main search, ``first_cutoffs`` the
+    ones caused by the first legal move tried.
+    """
+
+    depth: int
+    score: int
+    pv: list[str]
+    time: float
+    nodes: int
+    qnodes: int
+    tt_probes: int
+    tt_hits: int
+    cutoffs: int
+    first_cutoffs: int
+    # Nodes of this iteration over those of the previous one.
+    ebf: Optional[float] = None
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes / self.time) if self.time > 0 else 0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self) | {
+            "nps": self.nps,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "tt_hit_rate": self.tt_hit_rate,
+        }
+
+    def info(self) -> list[str]:
+        """UCI ``info`` lines; figures UCI has no field for go in an
+        ``info string``."""
+        line = (
+            f"info depth {self.depth} score {_uci_score(self.score)}"
+            f" time {int(self.time * 1000)} nodes {self.nodes} nps {self.nps}"
+        )
+        if self.pv:
+            line += " pv " + " ".join(self.pv)
+        ebf = "-" if self.ebf is None else f"{self.ebf:.2f}"
+        return [
+            line,
+            f"info string qnodes {self.qnodes} ebf {ebf}"
+            f" fmc {self.first_move_cutoff_rate:.3f} tthit {self.tt_hit_rate:.3f}",
+        ]
+
+
+def _uci_score(score: int) -> str:
+    if abs(score) < MATE - MAX_PLY:
+        return f"cp {score}"
+    plies = MATE - abs(score)
+    moves = (plies + 1) // 2
+    return f"mate {moves if score > 0 else -moves}"
+
+
+class Telemetry:
+    """Per-iteration statistics of the searches it is attached to.
+
+    A :class:`Search` always keeps its plain integer counters; only with a
+    telemetry attached does it snapshot them around each iteration, so
+    leaving ``Search.telemetry`` as ``None`` costs nothing beyond them.
+    Iterations of each search are kept in ``searches``; with ``out`` set,
+    every completed iteration is also written there as UCI ``info`` lines.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None) -> None:
+        self.out = out
+        self.searches: list[list[IterationStats]] = []
+        self._before: tuple[int, ...] = ()
+        self._started = 0.0
+
+    @property
+    def iterations(self) -> list[IterationStats]:
+        """Iterations of the latest search."""
+        return self.searches[-1] if self.searches else []
+
+    def begin_search(self) -> None:
+        self.searches.append([])
+
+    def begin(self, search: Search) -> None:
+        self._before = search.counters()
+        self._started = time.perf_counter()
+
+    def end(self, search: Search, depth: int, score: int, pv: list[Move]) -> None:
+        elapsed = time.perf_counter() - self._started
+        counts = [now - then for now, then in zip(search.counters(), self._before)]
+        iterations = self.iterations
+        ebf = None
+        if iterations and iterations[-1].nodes:
+            ebf = counts[0] / iterations[-1].nodes
+        stats = IterationStats(
+            depth, score, [f"{src}{dst}" for src, dst in pv], elapsed, *counts, ebf
+        )
+        iterations.append(stats)
+        if self.out is not None:
+            for line in stats.info():
+                print(line, file=self.out)
+            self.out.flush()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"searches": [[it.as_dict() for it in s] for s in self.searches]}
+
+    def dump(self, path: str) -> None:
+        """Write every recorded search as a JSON trace."""
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def clear(self) -> None:
+        self.searches.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Search one position and report per-iteration telemetry."
+    )
+    parser.add_argument("fen")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--time", type=float, default=None, help="seconds")
+    parser.add_argument("--backend", choices=BACKENDS, default="legal")
+    parser.add_argument("--trace", help="JSON trace file to write")
+    args = parser.parse_args()
+
+    telemetry = Telemetry(sys.stdout)
+    search = Search(telemetry=telemetry)
+    engine = create_engine(args.backend, args.fen)
+    result = search.think(engine, side_to_move(args.fen), args.depth, args.time)
+    if result.move is not None:
+        print(f"bestmove {result.move[0]}{result.move[1]}")
+    if args.trace:
+        telemetry.dump(args.trace)
+
+
+if __name__ == "__main__":
+    main()
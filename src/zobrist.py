@@ -0,0 +1,11 @@
+import random
+
+from .piece import Type
+
+_rng = random.Random(0x5EED)
+
+PIECE_KEYS: list[list[int]] = [
+    [_rng.getrandbits(64) for _ in range(64)] for _ in range(2 * max(Type))
+]
+SIDE_KEY: int = _rng.getrandbits(64)
+EP_KEYS: list[int] = [_rng.getrandbits(64) for _ in range(8)]